@@ -0,0 +1,73 @@
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import zpp_serializer as z
+
+@z.serializable()
+class Event(object):
+    seq = z.Uint64
+    name = z.String
+    values = z.Vector(z.Int32)
+
+N = 200000
+LOOKUPS = 10000
+VALUES = 32
+
+def megabytes(path):
+    return os.path.getsize(path) / float(1 << 20)
+
+def write(path, **kwargs):
+    events = [Event(seq=i, name='event', values=[i] * VALUES) for i in range(N)]
+    start = time.time()
+    with z.RecordWriter(path, **kwargs) as writer:
+        for event in events:
+            writer.write(event)
+    return (time.time() - start) * 1e3 / megabytes(path)
+
+def read(path, **kwargs):
+    with z.RecordReader(path, Event, **kwargs) as reader:
+        start = time.time()
+        for item in reader:
+            pass
+        return (time.time() - start) * 1e3 / megabytes(path)
+
+def lookups(path, keys, **kwargs):
+    with z.RecordReader(path, Event, **kwargs) as reader:
+        start = time.time()
+        for key in keys:
+            assert reader[key].seq == key
+        return (time.time() - start) / len(keys) * 1e6
+
+def scan(path, keys):
+    with open(path, 'rb') as records:
+        data = records.read()
+    start = time.time()
+    count, flags, index = z.RecordIndex.read(data)
+    offsets = z.frame_offsets(memoryview(data)[:index])
+    archive = z.MemoryInputArchive(data)
+    for key in keys:
+        archive.index = offsets[key] + z.SizeType.__zpp_class__.size
+        item = Event()
+        archive(item)
+        assert item.seq == key
+    return (time.time() - start) / len(keys) * 1e6
+
+if __name__ == '__main__':
+    directory = tempfile.mkdtemp()
+    try:
+        for checksums in (False, True):
+            path = os.path.join(directory, 'log.bin')
+            written = write(path, checksums=checksums)
+            keys = [random.randrange(N) for i in range(LOOKUPS)]
+            print('checksums=%-5s %6.1fMB   write %5.2fms/MB   read %5.2fms/MB   unverified read %5.2fms/MB' % (
+                checksums, megabytes(path), written, read(path), read(path, verify=False)))
+            print('%15s lookup %5.1fus   unverified %5.1fus   frame scan %5.1fus' % (
+                '', lookups(path, keys), lookups(path, keys, verify=False), scan(path, keys)))
+            os.remove(path)
+    finally:
+        shutil.rmtree(directory)
@@ -0,0 +1,71 @@
+import multiprocessing
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import zpp_serializer as z
+
+@z.serializable()
+class Tick(object):
+    seq = z.Uint64
+    price = z.Double
+    size = z.Uint32
+    side = z.Uint8
+
+@z.serializable()
+class Message(object):
+    seq = z.Uint64
+    symbol = z.String
+    prices = z.Vector(z.Double)
+
+N = 50000
+
+def ring_consumer(name, factory, count):
+    ring = z.ShmRing(name)
+    item = factory()
+    done = 0
+    while done < count:
+        if ring.pop(item) is not None:
+            done += 1
+        else:
+            time.sleep(0)
+    ring.close()
+
+def queue_consumer(queue, factory, count):
+    item = factory()
+    for i in range(count):
+        z.MemoryInputArchive(queue.get())(item)
+
+def run(label, factory, make):
+    items = [make(i) for i in range(1000)]
+    ring = z.ShmRing(slots=4096, slot_size=512)
+    p = multiprocessing.Process(target=ring_consumer, args=(ring.name, factory, N))
+    p.start()
+    start = time.time()
+    i = 0
+    while i < N:
+        if ring.push(items[i % 1000]):
+            i += 1
+        else:
+            time.sleep(0)
+    p.join()
+    ring_time = time.time() - start
+    ring.close(); ring.unlink()
+
+    queue = multiprocessing.Queue(4096)
+    p = multiprocessing.Process(target=queue_consumer, args=(queue, factory, N))
+    p.start()
+    start = time.time()
+    for i in range(N):
+        data = bytearray()
+        z.MemoryOutputArchive(data)(items[i % 1000])
+        queue.put(bytes(data))
+    p.join()
+    queue_time = time.time() - start
+    print('%-10s ShmRing %7.0f msg/s   Queue %7.0f msg/s   (%.1fx)' % (
+        label, N / ring_time, N / queue_time, queue_time / ring_time))
+
+if __name__ == '__main__':
+    run('Tick', Tick, lambda i: Tick(seq=i, price=1.5, size=100, side=1))
+    run('Message', Message, lambda i: Message(seq=i, symbol='ABCD', prices=[1.0] * 16))
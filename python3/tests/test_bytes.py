@@ -0,0 +1,115 @@
+import mmap
+
+import zpp_serializer as z
+
+
+@z.serializable()
+class Frame(object):
+    id = z.Uint32
+    payload = z.Bytes
+
+
+@z.serializable()
+class Old(object):
+    id = z.Uint32
+    payload = z.Vector(z.Uint8)
+
+
+raw = bytes(bytearray(range(256))) * 10
+
+
+def encode(item):
+    data = bytearray()
+    z.MemoryOutputArchive(data)(item)
+    return data
+
+
+def test_wire_compatible_with_vector_of_uint8():
+    assert encode(Frame(id=7, payload=raw)) == encode(Old(id=7, payload=list(bytearray(raw))))
+    old = Old()
+    z.MemoryInputArchive(encode(Frame(id=7, payload=raw)))(old)
+    assert bytes(old.payload.data) == raw
+
+
+def test_immutable_sources_are_referenced():
+    assert Frame(payload=raw).payload.data is raw
+    source = bytes(encode(Frame(id=7, payload=raw)))
+    frame = Frame()
+    z.MemoryInputArchive(source)(frame)
+    assert frame.payload.data.obj is source
+    assert bytes(frame.payload) == raw and frame.payload[3] == 3
+
+
+def test_writable_sources_are_referenced():
+    source = bytearray(8 << 20)
+    view = memoryview(source)
+    frame = Frame(payload=view)
+    assert frame.payload.data.obj is source
+    source[0] = 255
+    assert frame.payload[0] == 255
+    del view
+    frame.payload[1] = 1
+    assert type(frame.payload.data) is bytearray and source[1] == 0
+    assert frame.payload[0] == 255 and frame.payload[1] == 1
+
+    source = bytearray(raw)
+    frame = Frame(payload=source)
+    assert frame.payload.data.obj is source
+    frame.payload.append(1)
+    assert len(source) == len(raw) and len(frame.payload) == len(raw) + 1
+
+
+def test_decoded_mutable_sources_are_copied():
+    data = bytearray()
+    out = z.MemoryOutputArchive(data)
+    out(Frame(id=1, payload=raw))
+    frame = Frame()
+    z.MemoryInputArchive(data)(frame)
+    out(Frame(id=2, payload=b'more'))
+    data[10] = 0xff
+    assert bytes(frame.payload) == raw
+
+
+def test_chunked_archive_copies_mutable_segments():
+    data = encode(Frame(id=1, payload=raw))
+    segments = [data[:100], data[100:]]
+    frame = Frame()
+    z.ChunkedInputArchive(segments)(frame)
+    segments[1][0] = 0xff
+    assert bytes(frame.payload) == raw
+
+
+def test_writes_copy_referenced_payloads():
+    payload = z.Bytes(b'abc')
+    payload[0] = 65
+    assert bytes(payload) == b'Abc'
+
+    source = bytes(encode(Frame(id=7, payload=raw)))
+    frame = Frame()
+    z.MemoryInputArchive(source)(frame)
+    frame.payload[0] = 9
+    frame.payload.append(1)
+    assert frame.payload[0] == 9 and len(frame.payload) == len(raw) + 1
+
+    view = memoryview(b'xyz')
+    payload = z.Bytes(view)
+    payload[2] = 65
+    assert bytes(payload) == b'xyA' and view.tobytes() == b'xyz'
+
+
+def test_read_only_mmap_slices_are_referenced():
+    buffer = mmap.mmap(-1, 16)
+    buffer[:] = b'0123456789abcdef'
+    frame = Frame(payload=memoryview(buffer)[4:8])
+    assert encode(frame)[-4:] == b'4567'
+    frame.payload = memoryview(buffer).toreadonly()[8:12]
+    assert frame.payload.data.obj is buffer
+    frame = None
+
+
+def test_buffer_protocol_objects():
+    import array
+    assert len(z.Bytes(5)) == 5 and list(z.Bytes([1, 2])) == [1, 2]
+    assert len(z.Bytes(z.Vector(z.Uint8)([1, 2, 3]))) == 3
+    assert len(z.Bytes(array.array('H', [1, 2]))) == 4
+    assert bytes(z.Bytes(b'xy')) == b'xy'
@@ -0,0 +1,136 @@
+import gc
+
+import pytest
+
+import zpp_serializer as z
+
+
+@z.serializable()
+class Point(object):
+    x = z.Int32
+    y = z.Int32
+
+
+@z.serializable()
+class Segment(object):
+    a = Point
+    b = Point
+
+
+@z.serializable()
+class Inner(object):
+    vals = z.Vector(z.Int32)
+    tags = z.Vector(z.String)
+
+
+@z.serializable()
+class Config(object):
+    name = z.String
+    limit = z.Uint32
+    vals = z.Vector(z.Int32)
+    points = z.Vector(Point)
+    seg = Segment
+    inner = Inner
+    inners = z.Vector(Inner)
+    arr = z.Array(Point, 2)
+    small = z.Vector(z.Compact(z.Uint32))
+    blob = z.Bytes
+
+
+@z.polymorphic('tests::cache::base')
+class Base(object):
+    value = z.Uint64
+
+
+def serialize(*items):
+    data = bytearray()
+    z.MemoryOutputArchive(data)(*items)
+    return bytes(data)
+
+
+def fresh(item):
+    return serialize(z.uncached(type(item)(item)))
+
+
+def make_config():
+    return Config(name='abc', limit=5, vals=[1, 2], points=[Point(x=1, y=2)],
+                  inner=Inner(vals=[1], tags=['t']), inners=[Inner(vals=[3])], small=[1], blob=b'xy')
+
+
+def test_cache_round_trip():
+    config = z.cached(make_config())
+    expected = fresh(config)
+    assert serialize(config) == expected and config.__zpp_cache__ == expected
+    assert serialize(config, config) == expected * 2
+    config.limit = 6
+    assert config.__zpp_cache__ is False
+    assert serialize(config) == fresh(config) != expected
+    z.MemoryInputArchive(bytearray(expected))(config)
+    assert config.limit == 5 and serialize(config) == expected
+
+
+@pytest.mark.parametrize('mutate', [
+    lambda config: config.vals.append(5),
+    lambda config: config.vals.__setitem__(0, 9),
+    lambda config: config.vals.pop(),
+    lambda config: config.vals.resize(5),
+    lambda config: config.name.__setitem__(0, 'x'),
+    lambda config: config.points.append(Point(x=3, y=4)),
+    lambda config: setattr(config.points[0], 'x', 42),
+    lambda config: [setattr(point, 'y', 5) for point in config.points],
+    lambda config: [setattr(point, 'y', 6) for point in config.points.cursor()],
+    lambda config: config.points.set_column('x', [11]),
+    lambda config: setattr(config.seg.a, 'x', 3),
+    lambda config: setattr(config.seg, 'b', Point(x=1, y=1)),
+    lambda config: config.inner.vals.append(4),
+    lambda config: config.inner.tags[0].__setitem__(0, 'q'),
+    lambda config: config.inners[0].vals.append(1),
+    lambda config: config.inners.append(Inner()),
+    lambda config: setattr(config.arr[1], 'y', 8),
+    lambda config: config.small.append(300),
+    lambda config: config.blob.append(1),
+])
+def test_in_place_mutation_invalidates(mutate):
+    config = z.cached(make_config())
+    serialize(config)
+    assert config.__zpp_cache__
+    mutate(config)
+    assert serialize(config) == fresh(config)
+    mutate(config)
+    assert serialize(config) == fresh(config)
+
+
+def test_nested_cached_objects():
+    config = z.cached(make_config())
+    inner = z.cached(config.inner)
+    serialize(config)
+    serialize(inner)
+    inner.vals.append(9)
+    assert not inner.__zpp_cache__ and not config.__zpp_cache__
+    assert serialize(config) == fresh(config)
+
+
+def test_container_and_polymorphic_cache():
+    configs = z.cached(z.Vector(Config)([Config(limit=1)]))
+    first = serialize(configs)
+    assert serialize(configs) == first and configs.__zpp_cache__
+    configs.append(Config(limit=2))
+    assert not configs.__zpp_cache__ and serialize(configs) != first
+    base = z.cached(Base(value=7))
+    data = serialize(base)
+    assert serialize(base) == data and base.__zpp_cache__ == data
+    assert not hasattr(type(z.cached(Point())).__zpp_class__, 'cached')
+
+
+def test_serialization_cache_bounds():
+    cache = z.SerializationCache(capacity=2)
+    a, b, c = Config(limit=1), Config(limit=2), Config(limit=3)
+    for item in (a, b, a, c):
+        serialize(cache(item))
+    assert len(cache) == 2
+    assert b.__zpp_cache__ is None and a.__zpp_cache__ and c.__zpp_cache__
+    del a
+    gc.collect()
+    assert len(cache) == 1
+    cache.clear()
+    assert c.__zpp_cache__ is None and len(cache) == 0
@@ -0,0 +1,86 @@
+import random
+
+import pytest
+
+import zpp_serializer as z
+
+
+@z.serializable()
+class Point(object):
+    x = z.Int32
+    y = z.Int32
+
+
+@z.serializable()
+class Entry(object):
+    key = z.String
+    values = z.Vector(z.Int16)
+    where = Point
+    flag = z.Bool
+
+
+@z.polymorphic('tests::chunked::base')
+class Base(object):
+    id = z.Uint32
+
+
+@z.polymorphic('tests::chunked::message')
+class Message(Base):
+    name = z.String
+    points = z.Vector(Point)
+    entries = z.Vector(Entry)
+    arr = z.Array(Entry, 2)
+    tail = z.Uint64
+    payload = z.Bytes
+
+
+def make(i):
+    return Message(id=i, name='message %d' % i, points=[Point(x=j, y=-j) for j in range(i % 5)],
+                   entries=[Entry(key='k' * j, values=list(range(j)), where=Point(x=j, y=j), flag=j % 2)
+                            for j in range(i % 4)],
+                   tail=i * 1000, payload=b'p' * (i % 7))
+
+
+def split(data, sizes):
+    chunks = []
+    position = 0
+    for size in sizes:
+        chunks.append(data[position:position + size])
+        position += size
+    chunks.append(data[position:])
+    return chunks
+
+
+def encode(*items):
+    data = bytearray()
+    z.MemoryOutputArchive(data)(*items)
+    return bytes(data)
+
+
+@pytest.mark.parametrize('seed', range(6))
+def test_chunked_matches_contiguous(seed):
+    messages = [make(i) for i in range(40)]
+    data = encode(*messages)
+    generator = random.Random(seed)
+    if seed % 2:
+        sizes = [generator.randint(0, 9) for i in range(len(data))]
+    else:
+        sizes = [generator.randint(1, 200) for i in range(len(data) // 50)]
+    archive = z.ChunkedInputArchive(split(data, sizes))
+    assert str([archive(Base) for i in range(40)]) == str(messages)
+    assert archive.position == len(data)
+
+
+def test_chunked_truncated():
+    data = encode(make(3))
+    with pytest.raises(ValueError):
+        z.ChunkedInputArchive(split(data[:30], [7]))(Base)
+
+
+def test_chunked_iter_vector():
+    data = encode(z.Vector(z.Int32)(list(range(20))), z.Vector(Point)([Point(x=i) for i in range(6)]))
+    archive = z.ChunkedInputArchive(split(data, [5, 7, 3, 11]))
+    assert list(archive.iter_vector(z.Int32)) == list(range(20))
+    assert [point.x for point in archive.iter_vector(Point)] == list(range(6))
+    archive.reset(0)
+    assert sum(len(chunk.tobytes()) for chunk in archive.iter_vector(z.Int32, chunk_size=3)) == 80
@@ -0,0 +1,71 @@
+import array
+import os
+import subprocess
+import sys
+
+import pytest
+
+import zpp_serializer as z
+
+
+@z.serializable()
+class Sample(object):
+    x = z.Int32
+    y = z.Int64
+    f = z.Float
+
+
+def make_samples(count):
+    return [Sample(x=i, y=2 * i, f=i / 2.0) for i in range(count)]
+
+
+@pytest.mark.parametrize('cls', [z.Vector(Sample), z.Array(Sample, 4)])
+def test_column_round_trip(cls):
+    items = cls(make_samples(4))
+    assert list(items.column('x')) == [0, 1, 2, 3]
+    assert list(items.column('y')) == [0, 2, 4, 6]
+    assert list(items.column('f')) == [0.0, 0.5, 1.0, 1.5]
+    items.set_column('x', [10, 11, 12, 13])
+    assert [item.x for item in items] == [10, 11, 12, 13]
+
+
+@z.serializable()
+class Flagged(object):
+    value = z.Uint16
+    flag = z.Bool
+
+
+def test_column_type_is_array():
+    column = z.Vector(Sample)(make_samples(2)).column('y')
+    assert type(column) is array.array and column.typecode == 'q' and column == array.array('q', [0, 2])
+    assert z.Vector(Sample)().column('x') == array.array('i')
+    items = z.Vector(Flagged)([Flagged(value=1, flag=True), Flagged(value=2, flag=False)])
+    assert items.column('value') == array.array('H', [1, 2])
+    assert items.column('flag') == [True, False]
+
+
+def test_column_errors():
+    items = z.Vector(Sample)(make_samples(2))
+    with pytest.raises(TypeError):
+        items.column('z')
+    with pytest.raises(ValueError):
+        items.set_column('x', [1])
+
+
+def test_numpy_column():
+    numpy = pytest.importorskip('numpy')
+    items = z.Vector(Sample)(make_samples(3))
+    column = items.column('x', numpy=True)
+    assert isinstance(column, numpy.ndarray)
+    column[1] = 42
+    assert items[1].x == 42
+    items.set_column('x', numpy.arange(3, dtype=numpy.int32))
+    assert [item.x for item in items] == [0, 1, 2]
+    assert len(z.Vector(Sample)().column('x', numpy=True)) == 0
+
+
+def test_import_is_lazy():
+    modules = ('numpy', 'multiprocessing', 'mmap', 'lzma', 'zlib')
+    code = 'import sys, zpp_serializer; print(",".join(m for m in %r if m in sys.modules))' % (modules,)
+    output = subprocess.check_output([sys.executable, '-c', code], cwd=os.path.dirname(os.path.abspath(z.__file__)))
+    assert output.strip() == b''
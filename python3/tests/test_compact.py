@@ -0,0 +1,77 @@
+import pytest
+
+import zpp_serializer as z
+
+
+@z.serializable()
+class Tick(object):
+    id = z.Compact(z.Uint64)
+    delta = z.Compact(z.Int32)
+    price = z.Double
+    tags = z.Vector(z.String)
+
+
+@z.serializable()
+class Batch(object):
+    ticks = z.Vector(Tick)
+    name = z.String
+
+
+@z.polymorphic('tests::compact::event')
+class Event(object):
+    id = z.Compact(z.Uint32)
+
+
+values = [0, 1, 127, 128, 300, 2**32, 2**64 - 1]
+deltas = [0, -1, 1, -64, 64, -2**31, 2**31 - 1]
+
+
+def make_batch():
+    return Batch(ticks=[Tick(id=value, delta=delta, price=1.5, tags=['a'])
+                        for value, delta in zip(values, deltas)], name='batch')
+
+
+def test_compact_round_trip():
+    compact = bytearray()
+    z.CompactOutputArchive(compact)(make_batch())
+    memory = bytearray()
+    z.MemoryOutputArchive(memory)(make_batch())
+    assert len(compact) < len(memory)
+    for archive, data in ((z.CompactInputArchive, compact), (z.MemoryInputArchive, memory)):
+        batch = Batch()
+        archive(data)(batch)
+        assert [tick.id for tick in batch.ticks] == values
+        assert [tick.delta for tick in batch.ticks] == deltas
+        assert str(batch.name) == 'batch'
+
+
+def test_compact_errors():
+    with pytest.raises(TypeError):
+        z.Compact(z.Double)
+    with pytest.raises(OverflowError):
+        z.CompactOutputArchive(bytearray())(Tick(id=-1))
+
+
+def test_archive_functions_are_generated_on_first_use():
+    @z.serializable()
+    class Lazy(object):
+        id = z.Uint32
+        name = z.String
+
+    zpp_class = Lazy.__zpp_class__
+    assert type(zpp_class.__dict__['compact_serialize']) is not staticmethod
+    data = bytearray()
+    z.CompactOutputArchive(data)(Lazy(id=5, name='x'))
+    assert type(zpp_class.__dict__['compact_serialize']) is staticmethod
+    assert type(zpp_class.__dict__['compact_deserialize']) is not staticmethod
+    result = Lazy()
+    z.CompactInputArchive(data)(result)
+    assert result.id == 5 and str(result.name) == 'x'
+
+
+def test_polymorphic_compact_round_trip():
+    data = bytearray()
+    z.CompactOutputArchive(data)(Event(id=300))
+    event = z.CompactInputArchive(data)(Event)
+    assert type(event) is Event and event.id == 300
+    assert Event.__zpp_class__.non_polymorphic_compact_deserialize(Event(), z.CompactInputArchive(data[8:])) is None
@@ -0,0 +1,78 @@
+import pytest
+
+import zpp_serializer as z
+
+
+@z.serializable()
+class Tick(object):
+    seq = z.Uint64
+    price = z.Double
+
+
+@z.polymorphic('tests::compressed::base')
+class Base(object):
+    seq = z.Uint64
+
+
+@z.polymorphic('tests::compressed::event')
+class Event(Base):
+    name = z.String
+    values = z.Vector(z.Int32)
+
+
+def make_events(count):
+    return [Event(seq=i, name='event number %d' % (i % 10), values=[i % 3] * (i % 50)) if i % 4 else Base(seq=i)
+            for i in range(count)]
+
+
+@pytest.mark.parametrize('codec', ['zlib', 'lzma'])
+def test_compressed_round_trip_and_seek(tmp_path, codec):
+    pytest.importorskip(codec)
+    path = str(tmp_path / 'log.zz')
+    events = make_events(3000)
+    with z.CompressedOutputArchive(path, codec=codec, block_size=4096) as archive:
+        for event in events:
+            archive(event)
+        archive(Base(seq=3000), Base(seq=3001))
+        assert len(archive) == 3002
+    raw = bytearray()
+    z.MemoryOutputArchive(raw)(*events)
+    assert (tmp_path / 'log.zz').stat().st_size * 3 < len(raw)
+    with z.CompressedInputArchive(path) as archive:
+        assert len(archive) == 3002 and len(archive.offsets) > 10
+        assert str([archive(Base) for i in range(3000)]) == str(events)
+        first, second = archive(Base, Base)
+        assert (first.seq, second.seq) == (3000, 3001)
+        with pytest.raises(EOFError):
+            archive(Base)
+        for index in (1234, 5, 2999, 0, 3001, 1235):
+            archive.seek(index)
+            assert archive(Base).seq == index
+
+
+def test_compressed_single_block(tmp_path):
+    path = str(tmp_path / 'log.zz')
+    with z.CompressedOutputArchive(path, block_size=1 << 20) as archive:
+        for i in range(100):
+            archive(Tick(seq=i, price=i))
+    with z.CompressedInputArchive(path) as archive:
+        assert len(archive.offsets) == 1
+        tick = Tick()
+        archive.seek(50)
+        assert archive(tick) is None and tick.seq == 50
+
+
+def test_compressed_empty_and_invalid(tmp_path):
+    path = str(tmp_path / 'log.zz')
+    with z.CompressedOutputArchive(path):
+        pass
+    with z.CompressedInputArchive(path) as archive:
+        assert len(archive) == 0
+        with pytest.raises(EOFError):
+            archive(Tick())
+    with open(path, 'wb') as records:
+        records.write(b'nothing here at all, really')
+    with pytest.raises(ValueError):
+        z.CompressedInputArchive(path)
+    with pytest.raises(ValueError):
+        z.CompressedOutputArchive(str(tmp_path / 'other.zz'), codec='snappy')
@@ -0,0 +1,71 @@
+import pickle
+
+import zpp_serializer as z
+
+
+@z.serializable()
+class Point(object):
+    x = z.Int32
+    y = z.Int32
+
+    def norm(self):
+        return self.x * self.x + self.y * self.y
+
+
+@z.serializable()
+class Segment(object):
+    a = Point
+    b = Point
+
+
+def test_cursor_reads_and_writes_through():
+    vector = z.Vector(Point)([Point(x=i, y=-i) for i in range(5)])
+    assert [point.norm() for point in vector.cursor()] == [2 * i * i for i in range(5)]
+    for point in vector.cursor():
+        point.y = point.x * 10
+    assert [point.y for point in vector] == [0, 10, 20, 30, 40]
+
+
+def test_cursor_reuses_one_view():
+    vector = z.Vector(Point)([Point(x=i, y=i) for i in range(3)])
+    assert len(set(id(point) for point in vector.cursor())) == 1
+
+
+def test_cursor_nested_members():
+    vector = z.Vector(Segment)([Segment(a=Point(x=1, y=2), b=Point(x=3, y=4))] * 2)
+    for segment in vector.cursor():
+        segment.b.x = 7
+        segment.a = Point(x=5, y=6)
+    assert [(segment.a.x, segment.b.x) for segment in vector] == [(5, 7), (5, 7)]
+
+
+def test_cursor_over_borrowed_data_copies_owner():
+    data = bytearray()
+    z.MemoryOutputArchive(data)(z.Vector(Segment)([Segment()] * 2))
+    source = bytes(data)
+    vector = z.Vector(Segment)()
+    z.ViewInputArchive(source)(vector)
+    for segment in vector.cursor():
+        segment.a.y = 1
+    assert [segment.a.y for segment in vector] == [1, 1]
+    assert source == bytes(data)
+
+
+def test_cursor_view_as_value():
+    vector = z.Vector(Point)([Point(x=3, y=4)])
+    point = next(iter(vector.cursor()))
+    other = z.Vector(Point)()
+    other.append(point)
+    segment = Segment(a=point)
+    data = bytearray()
+    z.MemoryOutputArchive(data)(point)
+    assert other[0].x == 3 and segment.a.y == 4
+    assert bytes(data) == bytes(vector[0].__zpp_data__)
+    assert pickle.loads(pickle.dumps(point)).norm() == 25
+
+
+def test_array_cursor():
+    array = z.Array(Point, 3)([Point(x=i, y=i) for i in range(3)])
+    assert [point.x for point in array.cursor()] == [0, 1, 2]
+    nested = z.Vector(z.Array(z.Int32, 2))([[1, 2], [3, 4]])
+    assert [list(item) for item in nested.cursor()] == [[1, 2], [3, 4]]
@@ -0,0 +1,108 @@
+import pytest
+
+import zpp_serializer as z
+
+
+@z.serializable()
+class Quote(object):
+    bid = z.Double
+    ask = z.Double
+    size = z.Uint32
+    flags = z.Uint8
+
+
+@z.serializable()
+class Tick(object):
+    symbol = z.String
+    sequence = z.Uint64
+    quote = Quote
+    levels = z.Vector(z.Uint32)
+    venue = z.String
+
+
+@z.polymorphic('tests::delta::base')
+class Base(object):
+    sequence = z.Uint64
+
+
+@z.polymorphic('tests::delta::event')
+class Event(Base):
+    name = z.String
+    value = z.Int32
+
+
+def make_ticks(count):
+    return [Tick(symbol='AAPL', sequence=i, quote=Quote(bid=100.0 + (i % 3), ask=100.5, size=10, flags=1),
+                 levels=[1, 2, 3] if i < count // 2 else [4], venue='XNAS') for i in range(count)]
+
+
+def test_delta_round_trip():
+    ticks = make_ticks(50)
+    data = bytearray()
+    z.DeltaOutputArchive(data)(*ticks)
+    memory = bytearray()
+    z.MemoryOutputArchive(memory)(*ticks)
+    assert len(data) * 3 < len(memory) * 2
+
+    archive = z.DeltaInputArchive(data)
+    for tick in ticks:
+        result = Tick()
+        archive(result)
+        assert str(result.symbol) == 'AAPL' and result.sequence == tick.sequence
+        assert result.quote.bid == tick.quote.bid and result.quote.size == 10
+        assert list(result.levels) == list(tick.levels) and str(result.venue) == 'XNAS'
+    assert archive.index == len(data)
+
+
+def test_delta_interleaved_types():
+    ticks = make_ticks(30)
+    quotes = [Quote(bid=1.0, ask=2.0, size=i // 10, flags=1) for i in range(30)]
+    data = bytearray()
+    archive = z.DeltaOutputArchive(data)
+    for quote, tick in zip(quotes, ticks):
+        archive(quote, tick)
+    archive = z.DeltaInputArchive(data)
+    for quote, tick in zip(quotes, ticks):
+        result_quote, result_tick = Quote(), Tick()
+        archive(result_quote, result_tick)
+        assert (result_quote.bid, result_quote.ask, result_quote.size) == (1.0, 2.0, quote.size)
+        assert result_tick.sequence == tick.sequence
+
+
+def test_delta_polymorphic():
+    events = [Event(sequence=i, name='event', value=-i // 5) if i % 2 else Base(sequence=i) for i in range(20)]
+    data = bytearray()
+    z.DeltaOutputArchive(data)(*events)
+    archive = z.DeltaInputArchive(bytes(data))
+    for event in events:
+        result = archive(Base)
+        assert type(result) is type(event) and result.sequence == event.sequence
+        if type(event) is Event:
+            assert str(result.name) == 'event' and result.value == event.value
+
+
+def test_delta_reset():
+    ticks = make_ticks(3)
+    data = bytearray()
+    archive = z.DeltaOutputArchive(data)
+    archive(ticks[0])
+    archive.reset(0)
+    archive(ticks[1])
+    result = Tick()
+    z.DeltaInputArchive(data)(result)
+    assert result.sequence == 1
+
+
+def test_delta_requires_previous_item():
+    ticks = make_ticks(2)
+    data = bytearray()
+    z.DeltaOutputArchive(data)(*ticks)
+    first = bytearray()
+    z.DeltaOutputArchive(first)(ticks[0])
+    with pytest.raises(ValueError):
+        z.DeltaInputArchive(data, index=len(first))(Tick())
+
+
+def test_delta_rejects_fundamental_items():
+    with pytest.raises(TypeError):
+        z.DeltaOutputArchive()(z.Uint32(1))
@@ -0,0 +1,94 @@
+import pytest
+
+import zpp_serializer as z
+
+
+@z.serializable()
+class Line(object):
+    service = z.String
+    host = z.String
+    level = z.Uint8
+    message = z.String
+    labels = z.Vector(z.String)
+    wide = z.WString
+
+
+@z.polymorphic('tests::dictionary::base')
+class Base(object):
+    name = z.String
+
+
+@z.polymorphic('tests::dictionary::derived')
+class Derived(Base):
+    other = z.String
+
+
+services = ['auth-service', 'billing-service', 'search-service']
+
+
+def make_lines(count):
+    return [Line(service=services[i % 3], host='host-%d' % (i % 5), level=i % 4, message='m%d' % i,
+                 labels=['prod', services[i % 3]], wide=u'w') for i in range(count)]
+
+
+def check_line(result, line):
+    assert str(result.service) == str(line.service) and str(result.host) == str(line.host)
+    assert result.level == line.level and str(result.message) == str(line.message)
+    assert [str(label) for label in result.labels] == [str(label) for label in line.labels]
+    assert u'%s' % result.wide == u'w'
+
+
+def test_dictionary_round_trip():
+    lines = make_lines(200)
+    data = bytearray()
+    z.DictionaryOutputArchive(data)(*lines)
+    memory = bytearray()
+    z.MemoryOutputArchive(memory)(*lines)
+    assert len(data) * 2 < len(memory)
+
+    archive = z.DictionaryInputArchive(data)
+    for line in lines:
+        result = Line()
+        archive(result)
+        check_line(result, line)
+    assert archive.index == len(data)
+
+
+def test_dictionary_copy_on_write():
+    data = bytearray()
+    z.DictionaryOutputArchive(data)(*make_lines(3))
+    first, second = Line(), Line()
+    z.DictionaryInputArchive(bytes(data))(first, second)
+    assert first.labels[0].data is second.labels[0].data
+    first.labels[0][0] = 'P'
+    assert str(first.labels[0]) == 'Prod' and str(second.labels[0]) == 'prod'
+
+
+def test_dictionary_polymorphic_and_reset():
+    data = bytearray()
+    archive = z.DictionaryOutputArchive(data)
+    archive(Base(name='x'), Derived(name='x', other='y'))
+    archive.reset(len(data))
+    archive(Derived(name='x', other='x'))
+    archive = z.DictionaryInputArchive(data)
+    base, derived = archive(Base, Base)
+    assert str(base.name) == 'x' and type(derived) is Derived and str(derived.other) == 'y'
+    archive.reset(archive.index)
+    derived = archive(Base)
+    assert str(derived.name) == 'x' and str(derived.other) == 'x'
+
+
+def test_dictionary_capacity():
+    lines = make_lines(20)
+    data = bytearray()
+    z.DictionaryOutputArchive(data, capacity=2)(*lines)
+    archive = z.DictionaryInputArchive(data, capacity=2)
+    for line in lines:
+        result = Line()
+        archive(result)
+        check_line(result, line)
+
+
+def test_dictionary_invalid_reference():
+    with pytest.raises((ValueError, IndexError)):
+        z.DictionaryInputArchive(bytearray(b'\x03'))(Line())
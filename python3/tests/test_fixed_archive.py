@@ -0,0 +1,71 @@
+import sys
+
+import pytest
+
+import zpp_serializer as z
+
+
+@z.serializable()
+class Point(object):
+    x = z.Int32
+    y = z.Int32
+
+
+@z.polymorphic('tests::fixed_archive::base')
+class Base(object):
+    id = z.Uint16
+
+
+@z.polymorphic('tests::fixed_archive::derived')
+class Derived(Base):
+    name = z.String
+    wide = z.WString
+    points = z.Vector(Point)
+    arr = z.Array(z.Uint8, 3)
+    names = z.Vector(z.String)
+    payload = z.Bytes
+
+
+def serialize(*items):
+    data = bytearray()
+    z.MemoryOutputArchive(data)(*items)
+    return data
+
+
+def make_derived():
+    return Derived(id=1, name='hello', wide=u'abc', payload=b'xyz',
+                   points=[Point(x=i, y=i) for i in range(10)], names=['a', 'bcd', ''])
+
+
+def test_size_archive():
+    derived = make_derived()
+    expected = serialize(derived)
+    assert z.SizeArchive()(derived) == len(expected)
+    assert z.SizeArchive()(Point()) == 8
+    assert z.SizeArchive()(derived, Point()) == len(expected) + 8
+
+
+def test_fixed_memory_output_archive():
+    derived = make_derived()
+    expected = serialize(derived)
+    buffer = bytearray(len(expected) + 8)
+    archive = z.FixedMemoryOutputArchive(buffer)
+    archive(derived, Point(x=1, y=2))
+    assert archive.index == len(buffer) and buffer[:len(expected)] == expected
+    with pytest.raises(OverflowError):
+        archive(Point())
+    assert archive.index == len(buffer)
+
+
+@pytest.mark.skipif(sys.version_info < (3, 8), reason='requires shared_memory')
+def test_fixed_archive_over_shared_memory():
+    from multiprocessing import shared_memory
+    memory = shared_memory.SharedMemory(create=True, size=4096)
+    try:
+        z.FixedMemoryOutputArchive(memory.buf, index=16)(make_derived())
+        result = z.MemoryInputArchive(memory.buf, index=16)(Base)
+        assert str(result.name) == 'hello' and result.points[9].x == 9
+        del result
+    finally:
+        memory.close()
+        memory.unlink()
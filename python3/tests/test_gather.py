@@ -0,0 +1,58 @@
+import zpp_serializer as z
+
+
+@z.serializable()
+class Point(object):
+    x = z.Int32
+    y = z.Int32
+
+
+@z.polymorphic('tests::gather::frame')
+class Frame(object):
+    id = z.Uint32
+    name = z.String
+    payload = z.Bytes
+    points = z.Vector(Point)
+    small = z.Vector(z.Uint8)
+    names = z.Vector(z.String)
+
+
+big = bytes(bytearray(range(256))) * 64
+
+
+def make_frame():
+    return Frame(id=3, name='frame', payload=big, points=[Point(x=i, y=i) for i in range(1000)],
+                 small=[1, 2, 3], names=['a' * 10, 'b' * 5000, 'c'])
+
+
+def test_gather_matches_memory_archive():
+    frame = make_frame()
+    expected = bytearray()
+    z.MemoryOutputArchive(expected)(frame, Point(x=5, y=6), frame)
+    archive = z.GatherOutputArchive()
+    archive(frame, Point(x=5, y=6), frame)
+    buffers = archive.buffers()
+    assert b''.join(bytes(buffer) for buffer in buffers) == bytes(expected)
+    assert len(archive) == len(expected)
+    assert any(buffer is big for buffer in buffers)
+    assert len(archive.data) < len(expected) // 3
+
+
+def test_gather_clear():
+    archive = z.GatherOutputArchive()
+    archive(make_frame())
+    archive.clear()
+    assert len(archive) == 0 and archive.buffers() == []
+    archive(Point(x=1, y=2))
+    assert bytes(archive.buffers()[0]) == bytes(Point(x=1, y=2).__zpp_data__)
+
+
+def test_polymorphic_followed_by_more_data():
+    data = bytearray()
+    z.MemoryOutputArchive(data)(make_frame(), Point(x=5, y=6))
+    archive = z.MemoryInputArchive(data)
+    frame = archive(Frame)
+    point = Point()
+    archive(point)
+    assert (point.x, point.y) == (5, 6) and archive.index == len(data)
+    assert bytes(frame.payload) == big and str(frame.names[1]) == 'b' * 5000
@@ -0,0 +1,64 @@
+import zpp_serializer as z
+
+
+@z.serializable()
+class Order(object):
+    symbol = z.String
+    venue = z.String
+    quantity = z.Uint32
+    tags = z.Vector(z.String)
+    note = z.WString
+
+
+def make_orders(count):
+    return [Order(symbol=['AAPL', 'MSFT'][i % 2], venue='XNAS', quantity=i, tags=['a', 'b'], note=u'n')
+            for i in range(count)]
+
+
+def read_orders(archive, count):
+    results = []
+    for i in range(count):
+        result = Order()
+        archive(result)
+        results.append(result)
+    return results
+
+
+def test_intern_round_trip():
+    orders = make_orders(10)
+    data = bytearray()
+    z.MemoryOutputArchive(data)(*orders)
+    table = z.InternTable(capacity=16)
+    archive = z.InternInputArchive(data, strings=table)
+    results = read_orders(archive, len(orders))
+    assert archive.index == len(data)
+    assert [str(result.symbol) for result in results] == [str(order.symbol) for order in orders]
+    assert [result.quantity for result in results] == list(range(10))
+    assert u'%s' % results[1].note == u'n'
+    assert results[0].symbol.data is results[2].symbol.data
+    assert results[0].venue.data is results[5].venue.data
+    assert results[3].tags[1].data is results[4].tags[1].data
+    assert len(table) == 6
+
+    again = bytearray()
+    z.MemoryOutputArchive(again)(*results)
+    assert again == data
+
+
+def test_intern_copy_on_write():
+    data = bytearray()
+    z.MemoryOutputArchive(data)(*make_orders(6))
+    results = read_orders(z.InternInputArchive(bytes(data), strings=z.InternTable()), 6)
+    results[0].symbol[0] = 'B'
+    assert str(results[0].symbol) == 'BAPL' and str(results[2].symbol) == 'AAPL'
+    results[2].symbol.append(ord('X'))
+    assert str(results[2].symbol) == 'AAPLX' and str(results[4].symbol) == 'AAPL'
+
+
+def test_intern_table_capacity():
+    data = bytearray()
+    z.MemoryOutputArchive(data)(*make_orders(4))
+    table = z.InternTable(capacity=2)
+    results = read_orders(z.InternInputArchive(data, strings=table), 4)
+    assert len(table) == 2
+    assert [str(result.symbol) for result in results] == ['AAPL', 'MSFT', 'AAPL', 'MSFT']
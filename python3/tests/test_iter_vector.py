@@ -0,0 +1,57 @@
+import zpp_serializer as z
+
+
+@z.serializable()
+class Point(object):
+    x = z.Int32
+    y = z.Int32
+
+
+@z.serializable()
+class Entry(object):
+    key = z.String
+    values = z.Vector(z.Int16)
+
+
+@z.polymorphic('tests::iter_vector::base')
+class Base(object):
+    id = z.Uint32
+
+
+@z.polymorphic('tests::iter_vector::derived')
+class Derived(Base):
+    name = z.String
+
+
+def make_data():
+    data = bytearray()
+    archive = z.MemoryOutputArchive(data)
+    archive(z.Vector(z.Double)([i / 2.0 for i in range(10)]))
+    archive(z.Vector(Point)([Point(x=i, y=-i) for i in range(5)]))
+    archive(z.Vector(Entry)([Entry(key='k%d' % i, values=list(range(i))) for i in range(4)]))
+    archive(z.Uint32(77))
+    archive(z.Vector(z.Int32)(list(range(7))))
+    archive(z.SizeType(2), Derived(id=1, name='a'), Base(id=2))
+    return bytes(data)
+
+
+def test_iter_vector():
+    data = make_data()
+    archive = z.MemoryInputArchive(data)
+    assert list(archive.iter_vector(z.Double)) == [i / 2.0 for i in range(10)]
+    assert [(point.x, point.y) for point in archive.iter_vector(Point)] == [(i, -i) for i in range(5)]
+    assert [list(entry.values) for entry in archive.iter_vector(Entry)] == [[], [0], [0, 1], [0, 1, 2]]
+    assert archive(z.Uint32()) == 77
+    assert [list(chunk) for chunk in archive.iter_vector(z.Int32, chunk_size=3)] == [[0, 1, 2], [3, 4, 5], [6]]
+    items = list(archive.iter_vector(Base))
+    assert [type(item) for item in items] == [Derived, Base]
+    assert str(items[0].name) == 'a' and items[1].id == 2
+    assert archive.index == len(data)
+
+
+def test_iter_vector_stops_early():
+    archive = z.MemoryInputArchive(make_data())
+    values = archive.iter_vector(z.Double)
+    next(values)
+    next(values)
+    assert archive.index == 4 + 16
@@ -0,0 +1,48 @@
+import zpp_serializer as z
+
+
+@z.serializable()
+class Point(object):
+    x = z.Int32
+    y = z.Int32
+
+
+@z.serializable()
+class Message(object):
+    name = z.String
+    points = z.Vector(Point)
+
+
+def serialize(*items):
+    data = bytearray()
+    z.MemoryOutputArchive(data)(*items)
+    return data
+
+
+def test_output_buffer_reuses_storage():
+    message = Message(name='hello', points=[Point(x=i, y=i) for i in range(100)])
+    expected = serialize(message)
+    buffer = z.OutputBuffer(16)
+    assert buffer.capacity == 16 and len(buffer) == 0
+    buffer(message)
+    assert buffer.getvalue() == bytes(expected) and buffer.capacity >= 2 * len(expected)
+    data, capacity = buffer.data, buffer.capacity
+    for i in range(3):
+        buffer.clear()
+        buffer(message)
+        assert buffer.data is data and buffer.capacity == capacity
+        result = Message()
+        z.MemoryInputArchive(buffer.getbuffer())(result)
+        assert str(result.name) == 'hello' and result.points[99].x == 99
+    buffer.reserve(capacity + 1)
+    assert buffer.capacity == 2 * capacity
+
+
+def test_output_buffer_multiple_items():
+    buffer = z.OutputBuffer()
+    buffer(Point(x=1, y=2), Point(x=3, y=4))
+    assert len(buffer) == 16 and buffer.getvalue() == bytes(serialize(Point(x=1, y=2), Point(x=3, y=4)))
+    capacity = buffer.capacity
+    buffer.clear()
+    buffer(Point())
+    assert len(buffer) == 8 and buffer.capacity == capacity
@@ -0,0 +1,51 @@
+import pytest
+
+import zpp_serializer as z
+
+
+@z.serializable()
+class Entry(object):
+    key = z.String
+    values = z.Vector(z.Int32)
+    score = z.Double
+
+
+@z.serializable()
+class Point(object):
+    x = z.Int32
+    y = z.Int32
+
+
+def serialize(item):
+    data = bytearray()
+    z.MemoryOutputArchive(data)(item)
+    return data
+
+
+@pytest.mark.parametrize('workers, chunk_size', [(4, 100), (2, 4096), (1, 1), (3, 50000)])
+def test_serialize_parallel_matches_serial(workers, chunk_size):
+    entries = z.Vector(Entry)([Entry(key='k%d' % i, values=list(range(i % 5)), score=i) for i in range(1001)])
+    data = bytearray(b'head')
+    archive = z.MemoryOutputArchive(data)
+    archive.serialize_parallel(entries, workers=workers, chunk_size=chunk_size)
+    assert archive.index == len(data) and data[4:] == serialize(entries)
+
+
+@pytest.mark.parametrize('container', [
+    z.Vector(Entry)(),
+    z.Array(Entry, 3)([Entry(key='a'), Entry(key='bb'), Entry(key='ccc')]),
+    z.Vector(Point)([Point(x=i, y=i) for i in range(10)]),
+    z.Vector(z.Int32)(list(range(10))),
+    z.Vector(z.Compact(z.Uint32))([1, 300, 70000]),
+    z.Vector(z.String)(['a', 'bc']),
+])
+def test_serialize_parallel_containers(container):
+    data = bytearray()
+    z.MemoryOutputArchive(data).serialize_parallel(container, chunk_size=1)
+    assert data == serialize(container)
+
+
+def test_serialize_parallel_overflow():
+    entries = z.Vector(Entry)([Entry(key='k%d' % i) for i in range(100)])
+    with pytest.raises(OverflowError):
+        z.FixedMemoryOutputArchive(bytearray(100)).serialize_parallel(entries)
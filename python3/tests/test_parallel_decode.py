@@ -0,0 +1,77 @@
+import pytest
+
+import zpp_serializer as z
+
+
+@z.serializable()
+class Tick(object):
+    seq = z.Uint64
+    price = z.Double
+
+
+@z.polymorphic('tests::parallel_decode::base')
+class Base(object):
+    seq = z.Uint64
+
+
+@z.polymorphic('tests::parallel_decode::message')
+class Message(Base):
+    text = z.String
+    values = z.Vector(z.Int32)
+
+
+def price(tick):
+    return (tick.seq, tick.price)
+
+
+def summary(item):
+    if isinstance(item, Message):
+        return (item.seq, str(item.text), sum(item.values))
+    return (item.seq, None, 0)
+
+
+def write(path, items):
+    data = bytearray()
+    for item in items:
+        frame = bytearray()
+        z.MemoryOutputArchive(frame)(item)
+        data += z.SizeType.serialize(z.SizeType(len(frame))) + frame
+    with open(path, 'wb') as frames:
+        frames.write(data)
+    return data
+
+
+def test_frame_offsets():
+    data = bytearray()
+    for i in range(3):
+        data += z.SizeType.serialize(z.SizeType(i)) + b'x' * i
+    assert z.frame_offsets(data) == [0, 4, 9]
+    with pytest.raises(ValueError):
+        z.frame_offsets(data[:-1])
+
+
+@pytest.mark.parametrize('chunks', [None, 7, 1000])
+def test_parallel_decode(tmp_path, chunks):
+    path = str(tmp_path / 'ticks.bin')
+    write(path, [Tick(seq=i, price=i / 4.0) for i in range(1000)])
+    assert z.parallel_decode(path, Tick, workers=2, function=price, chunks=chunks) == \
+        [(i, i / 4.0) for i in range(1000)]
+
+
+def test_parallel_decode_polymorphic(tmp_path):
+    path = str(tmp_path / 'messages.bin')
+    items = [Message(seq=i, text='m%d' % i, values=list(range(i % 7))) if i % 3 else Base(seq=i)
+             for i in range(301)]
+    write(path, items)
+    assert z.parallel_decode(path, Base, workers=2, function=summary) == [summary(item) for item in items]
+
+
+def test_parallel_decode_empty_and_truncated(tmp_path):
+    path = str(tmp_path / 'ticks.bin')
+    open(path, 'wb').close()
+    assert z.parallel_decode(path, Tick, workers=2) == []
+    data = write(path, [Tick(seq=i) for i in range(3)])
+    with open(path, 'wb') as frames:
+        frames.write(bytes(data[:30]))
+    with pytest.raises(ValueError):
+        z.parallel_decode(path, Tick, workers=2)
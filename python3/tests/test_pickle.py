@@ -0,0 +1,122 @@
+import copy
+import pickle
+
+import pytest
+
+import zpp_serializer as z
+
+
+@z.serializable()
+class Point(object):
+    x = z.Int32
+    y = z.Int32
+
+
+@z.polymorphic('test_pickle::person')
+class Person(object):
+    name = z.String
+    age = z.Compact(z.Uint32)
+
+
+@z.polymorphic('test_pickle::student')
+class Student(Person):
+    grades = z.Vector(z.Uint8)
+    friends = z.Vector(Person)
+
+
+@z.serializable()
+class Message(object):
+    title = z.String
+    points = z.Vector(Point)
+    nested = z.Vector(z.Vector(z.Double))
+    person = Person
+    fixed = z.Array(Point, 2)
+    counts = z.Array(z.Uint16, 4)
+    raw = z.Bytes
+
+
+def make_message():
+    return Message(title='hello', points=[Point(x=i, y=-i) for i in range(100)],
+                   nested=[[1.5, 2.5], [3.5]],
+                   person=Student(name='bob', age=300, grades=[1, 2],
+                                  friends=[Person(name='amy', age=9)]),
+                   fixed=[Point(x=1, y=2), Point(x=3, y=4)], counts=[1, 2, 3, 4], raw=b'\x00\x01')
+
+
+def encode(item):
+    data = bytearray()
+    z.MemoryOutputArchive(data)(item)
+    return data
+
+
+@pytest.mark.parametrize('protocol', range(pickle.HIGHEST_PROTOCOL + 1))
+def test_message_round_trip(protocol):
+    message = make_message()
+    result = pickle.loads(pickle.dumps(message, protocol))
+    assert type(result) is Message and encode(result) == encode(message)
+    assert type(result.person) is Student and str(result.person.friends[0].name) == 'amy'
+    assert result.person.age == 300 and type(result.person.age) is z.Compact(z.Uint32)
+    assert list(result.counts) == [1, 2, 3, 4]
+
+
+@pytest.mark.parametrize('protocol', range(pickle.HIGHEST_PROTOCOL + 1))
+def test_members_round_trip(protocol):
+    message = make_message()
+    for item in (message.points, message.nested, message.fixed, message.counts, message.person,
+                 message.points[3], message.title, message.raw, z.Array(z.Double, 3)([1.0, 2.0, 3.0])):
+        copied = pickle.loads(pickle.dumps(item, protocol))
+        assert type(copied) is type(item)
+        assert encode(copied) == encode(item)
+    for item in (z.Compact(z.Int16)(-5), z.Uint32(7)):
+        copied = pickle.loads(pickle.dumps(item, protocol))
+        assert type(copied) is type(item) and copied == item
+
+
+def test_factories_are_memoized():
+    assert z.Vector(Point) is z.Vector(Point)
+    assert z.Array(z.Uint16, 4) is type(make_message().counts)
+    assert copy.deepcopy(make_message().points[5]).x == 5
+    assert str(copy.copy(make_message()).title) == 'hello'
+
+
+@pytest.mark.skipif(pickle.HIGHEST_PROTOCOL < 5, reason='requires pickle protocol 5')
+def test_out_of_band_buffers_are_copied_on_write():
+    points = make_message().points
+    buffers = []
+    data = pickle.dumps(points, protocol=5, buffer_callback=buffers.append)
+    assert len(buffers) == 1 and len(data) < 200
+    result = pickle.loads(data, buffers=[bytes(buffer.raw()) for buffer in buffers])
+    assert [p.x for p in result] == list(range(100))
+    result[0] = Point(x=7, y=7)
+    assert result[0].x == 7 and points[0].x == 0
+
+
+@z.serializable()
+class Frame(object):
+    id = z.Uint32
+    samples = z.Vector(z.Double)
+    points = z.Vector(Point)
+    name = z.String
+
+
+@pytest.mark.skipif(pickle.HIGHEST_PROTOCOL < 5, reason='requires pickle protocol 5')
+def test_out_of_band_container_members():
+    frame = Frame(id=7, samples=[float(i) for i in range(1 << 17)],
+                  points=[Point(x=i, y=-i) for i in range(1 << 12)], name='frame')
+    buffers = []
+    data = pickle.dumps(frame, protocol=5, buffer_callback=buffers.append)
+    assert len(buffers) == 2 and len(data) < 1000
+    assert sum(len(buffer.raw()) for buffer in buffers) == 8 * (1 << 17) + 8 * (1 << 12)
+    result = pickle.loads(data, buffers=[bytes(buffer.raw()) for buffer in buffers])
+    assert type(result) is Frame and encode(result) == encode(frame)
+    result.samples[0] = -1.0
+    assert result.samples[0] == -1.0 and frame.samples[0] == 0.0
+
+    result = pickle.loads(pickle.dumps(frame, protocol=5))
+    assert encode(result) == encode(frame)
+    person = Student(name='bob', grades=list(range(256)) * 32)
+    buffers = []
+    data = pickle.dumps(person, protocol=5, buffer_callback=buffers.append)
+    assert len(buffers) == 1
+    result = pickle.loads(data, buffers=buffers)
+    assert type(result) is Student and encode(result) == encode(person)
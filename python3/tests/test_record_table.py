@@ -0,0 +1,72 @@
+import pytest
+
+import zpp_serializer as z
+
+
+@z.serializable()
+class Quote(object):
+    timestamp = z.Uint64
+    price = z.Double
+    size = z.Int32
+
+
+@z.serializable()
+class Named(object):
+    name = z.String
+    timestamp = z.Uint64
+
+
+def make_table(tmp_path, **kwargs):
+    return z.FixedRecordTable(Quote, str(tmp_path / 'quotes.bin'), **kwargs)
+
+
+@pytest.mark.parametrize('chunk_size', [1, 64, 1 << 20])
+def test_append_and_query(tmp_path, chunk_size):
+    with make_table(tmp_path, chunk_size=chunk_size) as table:
+        assert len(table) == 0 and table.query(0, 10) == []
+        table.extend(Quote(timestamp=t, price=t / 2.0, size=1) for t in range(0, 1000, 10))
+        for size in (2, 3):
+            table.append(Quote(timestamp=1000, price=1.0, size=size))
+            assert table[-1].size == size
+        assert len(table) == 102 and table[5].timestamp == 50
+        assert table.bisect_left(55) == 6 and table.bisect_right(50) == 6
+        assert [quote.timestamp for quote in table.query(95, 130)] == [100, 110, 120]
+        assert [quote.size for quote in table.query(1000)] == [2, 3]
+        with pytest.raises(ValueError):
+            table.append(Quote(timestamp=5))
+        assert len(table) == 102
+    with make_table(tmp_path) as table:
+        assert len(table) == 102 and table[101].size == 3
+
+
+def test_records_copy_on_write(tmp_path):
+    with make_table(tmp_path, chunk_size=1) as table:
+        table.extend(Quote(timestamp=t, price=1.0) for t in range(3))
+        record = table[1]
+        record.price = 5.0
+        assert record.price == 5.0 and table[1].price == 1.0
+        table.append(Quote(timestamp=10))
+        assert record.timestamp == 1
+
+
+def test_append_does_not_remap_every_record(tmp_path):
+    with make_table(tmp_path) as table:
+        table.append(Quote(timestamp=0))
+        data = table.data
+        for t in range(1, 100):
+            table.append(Quote(timestamp=t))
+        assert table.data is data and table.key(99) == 99
+
+
+def test_invalid_tables(tmp_path):
+    path = str(tmp_path / 'quotes.bin')
+    with z.FixedRecordTable(Quote, path) as table:
+        table.append(Quote(timestamp=1))
+    with open(path, 'ab') as records:
+        records.write(b'x')
+    with pytest.raises(ValueError):
+        z.FixedRecordTable(Quote, path)
+    with pytest.raises(TypeError):
+        z.FixedRecordTable(Named, path)
+    with pytest.raises(ValueError):
+        z.FixedRecordTable(Quote, str(tmp_path / 'other.bin'), 'missing')
@@ -0,0 +1,114 @@
+import pytest
+
+import zpp_serializer as z
+
+
+@z.serializable()
+class Tick(object):
+    seq = z.Uint64
+    price = z.Double
+
+
+@z.polymorphic('tests::records::base')
+class Base(object):
+    seq = z.Uint64
+
+
+@z.polymorphic('tests::records::trade')
+class Trade(Base):
+    symbol = z.String
+
+
+def write_crashed(path, items, tail=b''):
+    writer = z.RecordWriter(path, ids=True)
+    writer.write(*items)
+    writer.file.write(tail)
+    writer.file.close()
+
+
+def test_records_round_trip(tmp_path):
+    path = str(tmp_path / 'log.bin')
+    with z.RecordWriter(path) as writer:
+        for i in range(100):
+            writer.write(Tick(seq=i, price=i * 0.5))
+    with z.RecordReader(path, Tick) as reader:
+        assert len(reader) == 100 and reader[37].seq == 37 and reader[-1].price == 49.5
+        assert [tick.seq for tick in reader[10:13]] == [10, 11, 12]
+        with pytest.raises(IndexError):
+            reader[100]
+        with pytest.raises(ValueError):
+            reader.indices(Trade)
+    with pytest.raises(ValueError):
+        z.RecordWriter(path, ids=True)
+
+
+def test_polymorphic_records_and_append(tmp_path):
+    path = str(tmp_path / 'log.bin')
+    with z.RecordWriter(path, ids=True) as writer:
+        writer.write(*[Trade(seq=i, symbol='S%d' % i) if i % 2 else Base(seq=i) for i in range(10)])
+    with z.RecordWriter(path) as writer:
+        assert len(writer) == 10
+        writer.write(Trade(seq=10, symbol='new'))
+    with z.RecordReader(path, Base) as reader:
+        assert len(reader) == 11 and str(reader[10].symbol) == 'new'
+        assert reader.indices(Trade) == [1, 3, 5, 7, 9, 10]
+
+
+def test_missing_index_is_rejected(tmp_path):
+    path = str(tmp_path / 'log.bin')
+    write_crashed(path, [Base(seq=1)])
+    with pytest.raises(ValueError):
+        z.RecordReader(path, Base)
+    with pytest.raises(ValueError):
+        z.RecordWriter(path)
+
+
+@pytest.mark.parametrize('tail', [b'', b'\x20\x00', b'\x20\x00\x00\x00partial'])
+def test_recover_missing_index(tmp_path, tail):
+    path = str(tmp_path / 'log.bin')
+    write_crashed(path, [Trade(seq=i, symbol='S%d' % i) if i % 2 else Base(seq=i) for i in range(5)], tail)
+    with z.RecordReader(path, Base, recover=True) as reader:
+        assert [item.seq for item in reader] == list(range(5))
+        assert reader.indices(Trade) == [1, 3]
+    with z.RecordWriter(path, ids=True, checksums=True, recover=True) as writer:
+        assert len(writer) == 5
+        writer.write(Trade(seq=5, symbol='after'))
+    with z.RecordReader(path, Base) as reader:
+        assert [item.seq for item in reader] == list(range(6))
+        assert reader.has_checksums and str(reader[5].symbol) == 'after'
+        assert reader.indices(Trade) == [1, 3, 5]
+        reader.check(2)
+
+
+def test_checksums(tmp_path):
+    path = str(tmp_path / 'log.bin')
+    with z.RecordWriter(path, ids=True, checksums=True) as writer:
+        writer.write(*[Trade(seq=i, symbol='e%d' % i) if i % 2 else Base(seq=i) for i in range(20)])
+    with z.RecordWriter(path) as writer:
+        writer.write(Base(seq=20))
+    with z.RecordReader(path, Base) as reader:
+        assert reader.has_checksums and len(reader) == 21
+        assert [item.seq for item in reader] == list(range(21))
+        reader.check(20)
+        offset = reader.offset(7)
+    with open(path, 'r+b') as records:
+        records.seek(offset + 4 + 8 + 8 + 4 + 1)
+        records.write(b'X')
+    with z.RecordReader(path, Base) as reader:
+        assert reader[6].seq == 6
+        with pytest.raises(ValueError):
+            reader[7]
+    with z.RecordReader(path, Base, verify=False) as reader:
+        assert str(reader[7].symbol) == 'eX'
+
+
+def test_checksums_are_not_added_to_existing_files(tmp_path):
+    path = str(tmp_path / 'log.bin')
+    with z.RecordWriter(path) as writer:
+        writer.write(Base(seq=1))
+    with pytest.raises(ValueError):
+        z.RecordWriter(path, checksums=True)
+    with z.RecordReader(path, Base) as reader:
+        assert not reader.has_checksums and reader[0].seq == 1
+        with pytest.raises(ValueError):
+            reader.checksum(0)
@@ -0,0 +1,120 @@
+import pytest
+
+import zpp_serializer as z
+
+
+@z.polymorphic('test_reference::person')
+class Person(object):
+    name = z.String
+    age = z.Uint32
+
+
+@z.polymorphic('test_reference::teacher')
+class Teacher(Person):
+    subject = z.String
+
+
+@z.polymorphic('test_reference::student')
+class Student(Person):
+    mentor = Person
+    university = z.String
+
+
+@z.serializable()
+class Course(object):
+    title = z.String
+    lead = Person
+    students = z.Vector(Student)
+    people = z.Vector(Person)
+    pair = z.Array(Person, 2)
+
+
+def make_course():
+    mentor = Teacher(name='Alice', age=50, subject='math')
+    course = Course(title='algebra', lead=mentor)
+    for i in range(10):
+        course.students.append(z.shared(Student(name='s%d' % i, age=20 + i, university='MIT',
+                                                mentor=z.shared(course.lead))))
+    course.people = [z.shared(course.lead)] + [z.shared(student) for student in course.students]
+    course.pair[0] = z.shared(course.students[0])
+    course.pair[1] = z.shared(course.lead)
+    return course
+
+
+def test_assignment_copies_polymorphic_values():
+    mentor = Teacher(name='Alice', age=50, subject='math')
+    student = Student(name='Bob', mentor=mentor)
+    assert student.mentor is not mentor
+    assert type(student.mentor) is Teacher and str(student.mentor.subject) == 'math'
+    student.mentor.age = 51
+    assert mentor.age == 50
+
+
+def test_shared_values_are_stored_by_reference():
+    mentor = Teacher(name='Alice', age=50, subject='math')
+    student = Student(name='Bob', mentor=z.shared(mentor))
+    assert student.mentor is mentor
+    people = z.Vector(Person)([z.shared(mentor), mentor])
+    people.append(z.shared(student))
+    assert people[0] is mentor and people[1] is not mentor and people[2] is student
+    student.mentor = z.shared(student)
+    assert student.mentor is student
+    with pytest.raises(TypeError):
+        student.mentor = z.shared(Course())
+
+
+def test_memory_archive_writes_runtime_types():
+    course = make_course()
+    data = bytearray()
+    z.MemoryOutputArchive(data)(course)
+    result = Course()
+    z.MemoryInputArchive(data)(result)
+    assert type(result.lead) is Teacher and str(result.lead.subject) == 'math'
+    assert type(result.students[3].mentor) is Teacher
+    assert type(result.people[0]) is Teacher
+    assert [str(p.name) for p in result.people[1:]] == ['s%d' % i for i in range(10)]
+    assert type(result.pair[0]) is Student and result.pair[1].age == 50
+    assert result.students[0].mentor is not result.students[1].mentor
+    assert z.SizeArchive()(course) == len(data)
+
+
+def test_shared_objects_round_trip_once():
+    course = make_course()
+    memory = bytearray()
+    z.MemoryOutputArchive(memory)(course)
+    data = bytearray()
+    z.ReferenceOutputArchive(data)(course)
+    assert len(data) * 2 < len(memory)
+
+    result = Course()
+    z.ReferenceInputArchive(data)(result)
+    lead = result.lead
+    assert type(lead) is Teacher and str(lead.subject) == 'math'
+    assert all(student.mentor is lead for student in result.students)
+    assert [s.age for s in result.students] == list(range(20, 30))
+    assert all(a is b for a, b in zip(result.people[1:], result.students))
+    assert result.people[0] is lead
+    assert result.pair[0] is result.students[0] and result.pair[1] is lead
+
+
+def test_stream_table_and_cycles():
+    mentor = Teacher(name='Alice', age=50, subject='math')
+    cyclic = Student(name='loop', age=1, university='x')
+    cyclic.mentor = z.shared(cyclic)
+    stream = bytearray()
+    writer = z.ReferenceOutputArchive(stream)
+    writer(mentor, cyclic, mentor)
+    writer.reset(len(stream))
+    writer(mentor)
+
+    reader = z.ReferenceInputArchive(bytes(stream))
+    a, b, c = reader(Person, Person, Person)
+    assert a is c and type(a) is Teacher and b.mentor is b
+    reader.reset(reader.index)
+    assert reader(Person) is not a
+    assert reader.index == len(stream)
+
+
+def test_unknown_reference():
+    with pytest.raises(ValueError):
+        z.ReferenceInputArchive(bytearray(b'\x05'))(Person)
@@ -0,0 +1,112 @@
+import multiprocessing
+import sys
+
+import pytest
+
+import zpp_serializer as z
+
+
+@z.serializable()
+class Record(object):
+    seq = z.Uint64
+    value = z.Double
+
+
+@z.serializable()
+class Packet(object):
+    seq = z.Uint64
+    payload = z.Bytes
+
+
+@z.polymorphic('tests::shm_ring::message')
+class Message(object):
+    seq = z.Uint64
+    text = z.String
+    values = z.Vector(z.Int32)
+
+
+def make_ring(slots=4, slot_size=256):
+    return z.ShmRing(slots=slots, slot_size=slot_size, create=True,
+                     buffer=bytearray(z.ShmRing.header_size + slots * slot_size))
+
+
+def test_push_pop_peek():
+    ring = make_ring()
+    assert len(ring) == 0 and ring.pop(Record()) is None and ring.peek(Record()) is None
+    for i in range(4):
+        assert ring.push(Record(seq=i, value=i / 2.0))
+    assert not ring.push(Record()) and len(ring) == 4
+    assert ring.pop(Record()).seq == 0
+    view = ring.peek(Record())
+    assert view.seq == 1 and view.value == 0.5 and view.__zpp_data__.readonly
+    ring.release()
+    assert ring.pop(Record()).seq == 2 and ring.pop(Record()).seq == 3
+    for i in range(10):
+        assert ring.push(Message(seq=i, text='m%d' % i, values=list(range(i))))
+        message = ring.pop(Message)
+        assert message.seq == i and str(message.text) == 'm%d' % i and list(message.values) == list(range(i))
+
+
+def test_push_overflow():
+    ring = make_ring()
+    with pytest.raises(OverflowError):
+        ring.push(Message(values=list(range(100))))
+    assert len(ring) == 0
+
+
+def test_pop_does_not_alias_slots():
+    ring = make_ring(slots=1)
+    ring.push(Packet(seq=1, payload=b'first'))
+    packet = ring.pop(Packet())
+    ring.push(Packet(seq=2, payload=b'later'))
+    assert bytes(packet.payload) == b'first'
+    assert bytes(ring.pop(Packet()).payload) == b'later'
+
+
+@pytest.mark.skipif(sys.version_info < (3, 8), reason='requires shared_memory')
+def test_shared_memory_close_with_live_views():
+    ring = z.ShmRing(slots=4, slot_size=256)
+    try:
+        other = z.ShmRing(ring.name)
+        assert other.slots == 4 and other.slot_size == 256
+        ring.push(Record(seq=42))
+        view = other.peek(Record())
+        assert view.seq == 42
+        other.close()
+        assert view.seq == 42
+        del view, other
+    finally:
+        ring.close()
+        ring.unlink()
+
+
+def consume(name, count, results):
+    ring = z.ShmRing(name)
+    expected = 0
+    while expected < count:
+        message = ring.pop(Message)
+        if message is not None:
+            if message.seq != expected or list(message.values) != [expected] * 3:
+                break
+            expected += 1
+    results.put(expected)
+    ring.close()
+
+
+@pytest.mark.skipif(sys.version_info < (3, 8), reason='requires shared_memory')
+def test_between_processes():
+    count = 2000
+    ring = z.ShmRing(slots=16, slot_size=256)
+    results = multiprocessing.Queue()
+    process = multiprocessing.Process(target=consume, args=(ring.name, count, results))
+    process.start()
+    try:
+        index = 0
+        while index < count:
+            if ring.push(Message(seq=index, text='x', values=[index] * 3)):
+                index += 1
+        assert results.get(timeout=60) == count
+    finally:
+        process.join()
+        ring.close()
+        ring.unlink()
@@ -0,0 +1,60 @@
+import pytest
+
+import zpp_serializer as z
+
+
+@z.serializable()
+class Point(object):
+    x = z.Int32
+    y = z.Int32
+
+
+def encode(item):
+    data = bytearray()
+    z.MemoryOutputArchive(data)(item)
+    return data
+
+
+def test_slice_reads():
+    values = z.Vector(z.Int32)(list(range(10)))
+    assert list(values[2:5]) == [2, 3, 4] and list(values[::3]) == [0, 3, 6, 9]
+    assert list(values[8:2]) == []
+    points = z.Vector(Point)([Point(x=i, y=i) for i in range(5)])
+    assert [p.x for p in points[1:3]] == [1, 2]
+    array = z.Array(z.Int16, 4)([1, 2, 3, 4])
+    assert list(array[1:3]) == [2, 3] and type(array[1:3]) is z.Vector(z.Int16)
+    assert str(z.String('hello')[1:4]) == 'ell'
+
+
+def test_slice_writes():
+    values = z.Vector(z.Int32)(list(range(5)))
+    values[1:3] = z.Vector(z.Int32)([7, 8, 9])
+    assert list(values) == [0, 7, 8, 9, 3, 4]
+    values[::2] = [1, 1, 1]
+    assert list(values) == [1, 7, 1, 9, 1, 4]
+    with pytest.raises(ValueError):
+        values[::2] = [1]
+    array = z.Array(z.Int16, 4)([1, 2, 3, 4])
+    with pytest.raises(ValueError):
+        array[0:2] = [1, 2, 3]
+
+
+def test_writing_a_slice_leaves_the_parent_alone():
+    values = z.Vector(z.Int32)(list(range(5)))
+    part = values[1:3]
+    part[0] = 100
+    part.append(5)
+    assert list(part) == [100, 2, 5] and list(values) == list(range(5))
+
+    points = z.Vector(Point)([Point(x=i, y=i) for i in range(5)])
+    part = points[1:3]
+    part[0].x = 100
+    assert part[0].x == 100 and points[1].x == 1
+
+
+def test_decoding_into_a_slice_leaves_the_parent_alone():
+    values = z.Vector(z.Int32)(list(range(5)))
+    part = values[1:3]
+    z.MemoryInputArchive(encode(z.Vector(z.Int32)([7, 8, 9])))(part)
+    assert list(part) == [7, 8, 9] and list(values) == list(range(5))
+
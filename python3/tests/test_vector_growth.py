@@ -0,0 +1,86 @@
+import pytest
+
+import zpp_serializer as z
+
+
+@z.serializable()
+class Point(object):
+    x = z.Int32
+    y = z.Int32
+
+
+@z.serializable()
+class Named(object):
+    name = z.String
+
+
+@pytest.mark.parametrize('cls, make, read', [
+    (z.Vector(z.Int32), lambda i: i, lambda item: item),
+    (z.Vector(Point), lambda i: Point(x=i, y=-i), lambda item: item.x),
+    (z.Vector(Named), lambda i: Named(name=str(i)), lambda item: int(str(item.name))),
+    (z.Vector(z.Compact(z.Uint32)), lambda i: i, lambda item: item),
+])
+def test_append_extend_pop_resize(cls, make, read):
+    vector = cls()
+    for i in range(5):
+        vector.append(make(i))
+    vector.extend([make(5), make(6)])
+    vector.extend(cls([make(7)]))
+    assert [read(item) for item in vector] == list(range(8))
+    assert read(vector.pop()) == 7 and read(vector.pop(0)) == 0
+    assert [read(item) for item in vector] == list(range(1, 7))
+    vector.resize(3)
+    assert [read(item) for item in vector] == [1, 2, 3]
+    vector.resize(5)
+    assert len(vector) == 5
+    with pytest.raises(IndexError):
+        cls().pop()
+
+
+def test_extend_from_raw_buffers():
+    vector = z.Vector(z.Int16)([1])
+    vector.extend(z.Int16.serialize(2) + z.Int16.serialize(3))
+    assert list(vector) == [1, 2, 3]
+    with pytest.raises(ValueError):
+        vector.extend(b'\x00')
+    points = z.Vector(Point)()
+    points.extend(memoryview(bytearray(16)))
+    assert len(points) == 2
+
+
+def test_growth_while_element_views_are_alive():
+    points = z.Vector(Point)([Point(x=i, y=i) for i in range(3)])
+    first = points[0]
+    iterator = iter(points)
+    next(iterator)
+    points.append(Point(x=3, y=3))
+    points.extend([Point(x=4, y=4)])
+    points.pop(1)
+    points.resize(6)
+    assert [p.x for p in points] == [0, 2, 3, 4, 0, 0]
+    assert first.x == 0
+
+    values = z.Vector(z.Int32)(list(range(3)))
+    view = memoryview(values.data)
+    values.append(3)
+    values.resize(2)
+    assert list(values) == [0, 1] and len(view) == 12
+
+
+def test_parent_grows_while_a_slice_is_alive():
+    values = z.Vector(z.Int32)(list(range(5)))
+    part = values[1:3]
+    values.append(5)
+    values.extend([6, 7])
+    values.resize(3)
+    values[0:1] = [9, 9]
+    assert list(values) == [9, 9, 1, 2] and list(part) == [1, 2]
+
+
+def test_growth_of_borrowed_vectors():
+    data = bytearray()
+    z.MemoryOutputArchive(data)(z.Vector(z.Int32)([1, 2]))
+    values = z.Vector(z.Int32)()
+    z.ViewInputArchive(bytes(data))(values)
+    values.append(3)
+    assert list(values) == [1, 2, 3]
@@ -0,0 +1,148 @@
+import zpp_serializer as z
+
+
+@z.serializable()
+class Point(object):
+    x = z.Int32
+    y = z.Int32
+
+
+@z.serializable()
+class Segment(object):
+    a = Point
+    b = Point
+
+
+@z.polymorphic('test_view_archive::base')
+class Base(object):
+    id = z.Uint16
+
+
+@z.polymorphic('test_view_archive::message')
+class Message(Base):
+    name = z.String
+    seg = Segment
+    points = z.Vector(Point)
+    values = z.Vector(z.Float)
+    arr = z.Array(Point, 2)
+    names = z.Vector(z.String)
+    payload = z.Bytes
+
+
+@z.serializable()
+class Envelope(object):
+    seg = Segment
+    points = z.Vector(Point)
+    name = z.String
+
+
+def make_envelope():
+    return Envelope(seg=Segment(a=Point(x=1, y=2), b=Point(x=3, y=4)),
+                    points=[Point(x=i, y=-i) for i in range(5)], name='hello')
+
+
+def encode(item):
+    data = bytearray()
+    z.MemoryOutputArchive(data)(item)
+    return data
+
+
+def make_message():
+    return Message(id=7, name='hello', payload=b'xyz', values=[1.5, 2.5],
+                   points=[Point(x=i, y=-i) for i in range(5)], names=['a', 'bc'],
+                   seg=Segment(a=Point(x=1, y=2), b=Point(x=3, y=4)),
+                   arr=[Point(x=1, y=1), Point(x=2, y=2)])
+
+
+def test_round_trip_without_copies():
+    data = bytes(encode(make_message()))
+    result = z.ViewInputArchive(data)(Base)
+    assert type(result) is Message and result.id == 7 and str(result.name) == 'hello'
+    assert result.points[4].y == -4 and list(result.values) == [1.5, 2.5]
+    assert result.seg.b.x == 3 and result.arr[1].y == 2
+    assert [str(name) for name in result.names] == ['a', 'bc']
+    assert bytes(result.payload) == b'xyz'
+    assert result.points.data.obj is data and result.seg.__zpp_data__.obj is data
+    assert encode(result) == data
+
+
+def test_owners_copy_on_write():
+    data = bytes(encode(make_message()))
+    result = z.ViewInputArchive(data)(Base)
+    result.seg.a = Point(x=10, y=20)
+    result.points[0] = Point(x=100, y=100)
+    result.values[1] = 9
+    result.name[0] = 'j'
+    result.arr[1] = Point(x=5, y=5)
+    result.points.append(Point(x=6, y=6))
+    assert result.seg.a.x == 10 and result.points[0].x == 100
+    assert list(result.values) == [1.5, 9] and str(result.name) == 'jello'
+    assert result.arr[1].x == 5 and len(result.points) == 6
+    assert data == bytes(encode(make_message()))
+
+
+def test_member_and_element_views_copy_their_owner():
+    data = bytes(encode(make_message()))
+    result = z.ViewInputArchive(data)(Base)
+    seg = result.seg
+    seg.a.x = 1
+    result.points[0].x = 2
+    result.arr[0].y = 3
+    for point in result.points:
+        point.y = 4
+    assert seg.a.x == 1 and result.seg.a.x == 1
+    assert result.points[0].x == 2 and [p.y for p in result.points] == [4] * 5
+    assert result.arr[0].y == 3
+    assert data == bytes(encode(make_message()))
+
+
+def test_memory_archive_decodes_into_borrowed_storage():
+    data = bytes(encode(make_envelope()))
+    result = Envelope()
+    z.ViewInputArchive(data)(result)
+    other = make_envelope()
+    other.points = [Point(x=9, y=9)]
+    other.seg.a.x = 11
+    z.MemoryInputArchive(encode(other))(result)
+    assert [p.x for p in result.points] == [9] and result.seg.a.x == 11
+    result.points[0].x = 12
+    result.seg.a.y = 13
+    assert result.points[0].x == 12 and result.seg.a.y == 13
+    assert data == bytes(encode(make_envelope()))
+
+
+def test_memory_archive_decodes_into_read_only_and_interned_storage():
+    point = Point(__zpp_data__=memoryview(b'\0' * 8))
+    z.MemoryInputArchive(encode(Point(x=1, y=2)))(point)
+    assert (point.x, point.y) == (1, 2)
+
+    envelope = make_envelope()
+    z.InternInputArchive(encode(envelope))(envelope)
+    assert type(envelope.name.data) is z.InternedBytes
+    z.MemoryInputArchive(encode(make_envelope()))(envelope)
+    envelope.name[0] = 'y'
+    assert str(envelope.name) == 'yello'
+
+
+def test_decode_into_element_view_writes_through():
+    points = z.Vector(Point)([Point(x=1, y=1), Point(x=2, y=2)])
+    z.MemoryInputArchive(encode(Point(x=7, y=8)))(points[1])
+    assert (points[1].x, points[1].y) == (7, 8)
+
+
+def test_decode_from_offset():
+    point = Point()
+    z.ViewInputArchive(bytearray(4) + z.Int32.serialize(5) + z.Int32.serialize(6), index=4)(point)
+    assert (point.x, point.y) == (5, 6)
+    point.x = 1
+    assert (point.x, point.y) == (1, 6)
+
+
+def test_cursor_over_borrowed_vector_copies_on_write():
+    data = bytes(encode(make_envelope()))
+    result = Envelope()
+    z.ViewInputArchive(data)(result)
+    for point in result.points.cursor():
+        point.x = 100
+    assert [p.x for p in result.points] == [100] * 5
+    assert data == bytes(encode(make_envelope()))
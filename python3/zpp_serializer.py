@@ -1,6 +1,11 @@
 import struct
 import sys
+import array
 import hashlib
+import bisect
+import os
+import collections
+import weakref
 
 __all__ = [
     'Uint64', 'Uint32', 'Uint16', 'Uint8',
@@ -8,8 +13,18 @@ __all__ = [
     'Float', 'Double', 'Bool',
     'serializable',
     'polymorphic',
-    'Vector', 'Array', 'BasicString', 'String', 'WString',
-    'MemoryInputArchive', 'MemoryOutputArchive'
+    'Vector', 'Array', 'BasicString', 'String', 'WString', 'Bytes',
+    'MemoryInputArchive', 'MemoryOutputArchive', 'OutputBuffer', 'GatherOutputArchive',
+    'FixedMemoryOutputArchive', 'SizeArchive', 'ViewInputArchive',
+    'ShmRing', 'frame_offsets', 'parallel_decode', 'RecordWriter', 'RecordReader',
+    'FixedRecordTable', 'ChunkedInputArchive',
+    'CompressedOutputArchive', 'CompressedInputArchive',
+    'Compact', 'CompactOutputArchive', 'CompactInputArchive',
+    'DeltaOutputArchive', 'DeltaInputArchive',
+    'cached', 'uncached', 'SerializationCache',
+    'InternTable', 'InternInputArchive',
+    'DictionaryOutputArchive', 'DictionaryInputArchive',
+    'ReferenceOutputArchive', 'ReferenceInputArchive', 'shared'
     ]
 
 def make_function(name, code):
@@ -19,6 +34,8 @@ def make_function(name, code):
     return environment[name]
 
 class SerializationGenerator(object):
+    size_context = type('context', (object,), {'container_size': True})
+
     class Code(list):
         def __init__(self):
             super(SerializationGenerator.Code, self).__init__(self)
@@ -53,6 +70,7 @@ class SerializationGenerator(object):
         self.function_name = '_'.join(('optimized', self.mode, cls.__name__))
         self.cls = cls
         self.archive_type = archive_type
+        self.non_polymorphic = False
         self.code = self.Code()
         self.code += [''.join(('def ', self.function_name, '(self, archive):'))]
         self.code.level += 1
@@ -67,7 +85,7 @@ class SerializationGenerator(object):
         self.archive_generator.generate_end()
         zpp_class = self.cls.__zpp_class__
         if self.mode == 'deserialize':
-           if hasattr(zpp_class, 'serialization_id') or zpp_class.fundamental:
+           if (hasattr(zpp_class, 'serialization_id') and not self.non_polymorphic) or zpp_class.fundamental:
                self.code += ['return self']
         return ('_'.join((self.archive_type.name, self.mode)), self.make_function())
 
@@ -91,22 +109,27 @@ class SerializationGenerator(object):
             self.archive_generator.generate(cls, variable_name)
             return
 
-        if cls.__zpp_class__.trivially_copyable:
+        if cls.__zpp_class__.trivially_copyable or cls.__zpp_class__.fundamental:
             self.archive_generator.generate(cls, variable_name)
             return
 
         if cls.__zpp_class__.container:
+            if hasattr(cls, 'encoding') and hasattr(self.archive_generator, 'generate_string'):
+                return self.archive_generator.generate_string(variable_name)
+
             if not hasattr(cls.__zpp_class__, 'array_size'):
                 if self.mode == 'serialize':
-                    self._generate_code(SizeType,
-                                       'SizeType(len({variable_name}))'.format(
-                                           variable_name=variable_name))
+                    self._generate_size_code('SizeType(len({variable_name}))'.format(
+                                                 variable_name=variable_name))
                 else:
-                    self._generate_code(SizeType, 'container_size')
-
-            if cls.element.__zpp_class__.trivially_copyable:
-                context = type('context', (object,),
-                               {'container_element_size': cls.element.__zpp_class__.size})
+                    self._generate_size_code('container_size')
+
+            if cls.element.__zpp_class__.trivially_copyable or cls.element.__zpp_class__.fundamental:
+                context = type('context', (object,), {
+                    'container_element_size': cls.element.__zpp_class__.size,
+                    'container_view': getattr(cls.__zpp_class__, 'view', False),
+                    'container_encoding': getattr(cls, 'encoding', None),
+                })
                 return self.archive_generator.generate(bytearray,
                                                        '{variable_name}.data'.format(
                                                           variable_name=variable_name),
@@ -117,13 +140,15 @@ class SerializationGenerator(object):
                         index_name = '_'.join(('index', str(self._index_id())))
                         self.archive_generator.generate_enter_loop()
                         self.code += [
-                            '{variable_name}.items = [None] * container_size' '\n'
-                            'for {index} in range(container_size):'.format(
+                            '{variable_name}.items = [None] * {size}' '\n'
+                            'for {index} in range({size}):'.format(
+                                variable_name=variable_name,
+                                size=getattr(cls.__zpp_class__, 'array_size', 'container_size'),
                                 index=index_name)
                         ]
                         self.code.level += 1
                         self._generate_code(cls.element,
-                                '{variable_name}[{index}]'.format(
+                                '{variable_name}.items[{index}]'.format(
                                     variable_name=variable_name,
                                     index=index_name))
                         self.code.level -= 1
@@ -134,7 +159,7 @@ class SerializationGenerator(object):
                     if not hasattr(cls.__zpp_class__, 'array_size'):
                         self.code += [
                             '{variable_name}.items = '
-                                'tuple({variable_name}.element() for i in range(container_size))'.format(
+                                '[{variable_name}.element() for i in range(container_size)]'.format(
                                     variable_name=variable_name)
                         ]
 
@@ -152,7 +177,8 @@ class SerializationGenerator(object):
                 self.item_id -= 1
                 return
 
-        is_polymorphic = hasattr(cls.__zpp_class__, 'serialization_id')
+        is_polymorphic = hasattr(cls.__zpp_class__, 'serialization_id') and \
+                not (self.non_polymorphic and variable_name == 'self')
 
         shortcut_set = False
         if '.' in variable_name and not (is_polymorphic and self.mode == 'deserialize'):
@@ -164,7 +190,23 @@ class SerializationGenerator(object):
             ]
             variable_name = shortcut
 
-        if hasattr(cls.__zpp_class__, 'serialization_id'):
+        reference = hasattr(self.archive_generator, 'generate_reference')
+        if is_polymorphic and variable_name != 'self' and (reference or self.mode == 'serialize'):
+            self.archive_generator.generate_flush()
+            if reference:
+                self.archive_generator.generate_reference(variable_name)
+            else:
+                self.code += [
+                    '{variable_name}.__zpp_class__.{serialize}({variable_name}, archive)'.format(
+                        variable_name=variable_name,
+                        serialize='_'.join((self.archive_type.name, 'serialize')))
+                ]
+            self.archive_generator.generate_reload()
+            if shortcut_set:
+                self.shortcut_id -= 1
+            return
+
+        if is_polymorphic:
             if self.mode == 'serialize':
                 self._generate_code(Uint64,
                                    '{variable_name}.__zpp_class__.serialization_id'.format(
@@ -191,9 +233,34 @@ class SerializationGenerator(object):
         if shortcut_set:
             self.shortcut_id -= 1
 
+    def _generate_size_code(self, variable_name):
+        self.archive_generator.generate(SizeType, variable_name, context=self.size_context)
+
     def make_function(self):
         return make_function(self.function_name, '\n'.join(self.code))
 
+class generated_function(object):
+    def __init__(self, cls, archive, non_polymorphic):
+        self.cls = cls
+        self.archive = archive
+        self.non_polymorphic = non_polymorphic
+
+    def __get__(self, instance, owner):
+        generator = SerializationGenerator(self.cls, self.archive)
+        generator.non_polymorphic = self.non_polymorphic
+        function_name, function = generator.generate_code()
+        if self.non_polymorphic:
+            function_name = '_'.join(('non_polymorphic', function_name))
+        setattr(self.cls.__zpp_class__, function_name, staticmethod(function))
+        return function
+
+def generate_lazily(cls, archives, non_polymorphic=False):
+    for archive in archives:
+        function_name = '_'.join((archive.name, 'serialize' if archive in output_archives else 'deserialize'))
+        if non_polymorphic:
+            function_name = '_'.join(('non_polymorphic', function_name))
+        setattr(cls.__zpp_class__, function_name, generated_function(cls, archive, non_polymorphic))
+
 class serializable(object):
     def __init__(self):
         self.previous_trace = sys.gettrace()
@@ -293,6 +360,7 @@ class serializable(object):
                     setattr(self, name, getattr(other, name)())
 
         def assign(self, name, value):
+            invalidate(self)
             try:
                 member_type = getattr(type(self), name)
                 return object.__setattr__(self, name, member_type.__zpp_class__.make(value))
@@ -320,7 +388,7 @@ class serializable(object):
 
         cls_members = base_members + derived_members
 
-        members = dict(cls.__dict__)
+        members = class_members(cls)
         members.update({
             '__zpp_class__': type('zpp_class', (object,), {
                 'members': cls_members,
@@ -328,20 +396,21 @@ class serializable(object):
                 'fundamental': False,
                 'container': False,
                 'trivially_copyable': False,
+                'cacheable': True,
                 'copy_constructor': staticmethod(copy_constructor),
                 'user_defined_constructor': cls.__init__ if cls.__init__ not in (base.__init__ for base in cls.__bases__) else None,
             }),
             '__init__': constructor,
+            '__reduce_ex__': zpp_reduce,
             '__setattr__': assign,
             '__getattribute__': object.__getattribute__,
+            '__zpp_cache__': None,
             '__str__': to_string,
             '__repr__': to_string,
             })
 
         cls = type(cls.__name__, cls.__bases__, members)
-        for archive in archives:
-            function_name, function = SerializationGenerator(cls, archive).generate_code()
-            setattr(cls.__zpp_class__, function_name, staticmethod(function))
+        generate_lazily(cls, archives)
 
         def make(value):
             obj = cls.__new__(cls)
@@ -404,7 +473,11 @@ class serializable(object):
                 return member_type(member_type.deserialize(
                     memoryview(self.__zpp_data__)[offset:offset+size])[0])
             size = member_type.__zpp_class__.size
-            return member_type(__zpp_data__=memoryview(self.__zpp_data__)[offset:offset+size])
+            data = self.__zpp_data__
+            view = member_type(__zpp_data__=memoryview(data)[offset:offset+size])
+            if linked(self):
+                borrow(view, self, '__zpp_data__', offset)
+            return view
 
         def assign(self, name, value):
             zpp_class = type(self).__zpp_class__
@@ -413,15 +486,16 @@ class serializable(object):
             member_type = getattr(type(self), name)
             offset = zpp_class.offsets[name]
             size = member_type.__zpp_class__.size
+            data = copy_on_write(self, '__zpp_data__')
             if member_type.__zpp_class__.fundamental:
-                self.__zpp_data__[offset:offset+size] = member_type.serialize(member_type(value))
+                data[offset:offset+size] = member_type.serialize(member_type(value))
                 return
             if member_type.__zpp_class__.container and hasattr(value, '__len__'):
-                member_type(value, __zpp_data__=memoryview(self.__zpp_data__)[offset:offset+size])
+                member_type(value, __zpp_data__=memoryview(data)[offset:offset+size])
                 return
-            if member_type != type(value):
+            if not isinstance(value, member_type):
                 raise TypeError("Cannot convert from '%s' to '%s'." % (type(value), member_type))
-            self.__zpp_data__[offset:offset+size] = value.__zpp_data__
+            data[offset:offset+size] = value.__zpp_data__
 
         def to_string(self, level=0, name=None):
             prefix = ' ' * level * 4
@@ -449,7 +523,7 @@ class serializable(object):
             offsets[member] = offset
             offset += getattr(cls, member).__zpp_class__.size
 
-        members = dict(cls.__dict__)
+        members = class_members(cls)
         members.update({
             '__zpp_class__': type('zpp_class', (object,), {
                 'members': cls_members,
@@ -463,6 +537,7 @@ class serializable(object):
                 'user_defined_constructor': cls.__init__ if cls.__init__ not in (base.__init__ for base in cls.__bases__) else None,
             }),
             '__init__': constructor,
+            '__reduce_ex__': zpp_reduce,
             '__getattribute__': at,
             '__setattr__': assign,
             '__str__': to_string,
@@ -470,9 +545,7 @@ class serializable(object):
             })
 
         cls = type(cls.__name__, cls.__bases__, members)
-        for archive in archives:
-            function_name, function = SerializationGenerator(cls, archive).generate_code()
-            setattr(cls.__zpp_class__, function_name, staticmethod(function))
+        generate_lazily(cls, archives)
 
         def make(value):
             obj = cls.__new__(cls)
@@ -481,6 +554,45 @@ class serializable(object):
 
         cls.__zpp_class__.make = staticmethod(make)
         cls.__zpp_class__.make_view = staticmethod(lambda value: value if type(value) == cls else make(value))
+
+        def cursor_data(self):
+            owner, name = object.__getattribute__(self, '__zpp_owner__')
+            offset = object.__getattribute__(self, '__zpp_offset__')
+            return memoryview(object.__getattribute__(owner, name))[offset : offset + size]
+
+        def set_cursor_data(self, value):
+            owner, name = object.__getattribute__(self, '__zpp_owner__')
+            offset = object.__getattribute__(self, '__zpp_offset__')
+            copy_on_write(owner, name)[offset : offset + size] = value
+
+        def cursor_at(self, name):
+            attribute = object.__getattribute__(self, name)
+            if name not in offsets or not hasattr(attribute, '__zpp_class__'):
+                return attribute
+            owner, owner_name = object.__getattribute__(self, '__zpp_owner__')
+            data = object.__getattribute__(owner, owner_name)
+            offset = object.__getattribute__(self, '__zpp_offset__') + offsets[name]
+            if attribute.__zpp_class__.fundamental:
+                return attribute(attribute.unpack_from(data, offset)[0])
+            view = attribute(__zpp_data__=memoryview(data)[offset : offset + attribute.__zpp_class__.size])
+            if linked(owner):
+                borrow(view, owner, owner_name, offset)
+            return view
+
+        def cursor_assign(self, name, value):
+            if name not in offsets:
+                return object.__setattr__(self, name, value)
+            owner, owner_name = object.__getattribute__(self, '__zpp_owner__')
+            offset = object.__getattribute__(self, '__zpp_offset__')
+            data = copy_on_write(owner, owner_name)
+            setattr(cls(__zpp_data__=memoryview(data)[offset : offset + size]), name, value)
+
+        cls.__zpp_class__.cursor_type = type(cls.__name__, (cls,), {
+            '__zpp_data__': property(cursor_data, set_cursor_data),
+            '__reduce_ex__': lambda self, protocol: zpp_reduce(make(self), protocol),
+            '__getattribute__': cursor_at,
+            '__setattr__': cursor_assign,
+        })
         return cls
 
     def trace(self, frame, event, argument):
@@ -499,20 +611,18 @@ class polymorphic(serializable):
         cls.__zpp_class__.serialization_id = self.serialization_id
         cls.__zpp_class__.trivially_copyable = False
 
-        cls = type(cls.__name__, cls.__bases__, dict(cls.__dict__))
-        for output_archive in output_archives:
-            function_name, function = SerializationGenerator(cls, output_archive).generate_code()
-            setattr(cls.__zpp_class__, function_name, staticmethod(function))
-
-        for input_archive in input_archives:
-            function_name, function = SerializationGenerator(cls, input_archive).generate_code()
-            setattr(cls.__zpp_class__, '_'.join(('non_polymorphic', function_name)),
-                   staticmethod(getattr(cls.__zpp_class__, function_name)))
-            setattr(cls.__zpp_class__, function_name, staticmethod(function))
+        cls = type(cls.__name__, cls.__bases__, class_members(cls))
+        generate_lazily(cls, archives)
+        generate_lazily(cls, input_archives, non_polymorphic=True)
 
         self.registry[self.serialization_id] = cls
 
         def make(value):
+            if type(value) is shared:
+                if not isinstance(value.value, cls):
+                    raise TypeError("Shared value of type '%s' is not a '%s'." % (
+                        type(value.value).__name__, cls.__name__))
+                return value.value
             if isinstance(value, cls):
                 obj = type(value).__new__(type(value))
                 obj.__zpp_class__.copy_constructor(obj, value)
@@ -525,6 +635,16 @@ class polymorphic(serializable):
         cls.__zpp_class__.make_view = staticmethod(make)
         return cls
 
+class shared(object):
+    def __init__(self, value):
+        self.value = value
+
+def class_members(cls):
+    members = dict(cls.__dict__)
+    members.pop('__dict__', None)
+    members.pop('__weakref__', None)
+    return members
+
 def printable_container(cls):
     def to_string(self, level=0, name=None):
         prefix = ' ' * level * 4
@@ -546,7 +666,7 @@ def printable_container(cls):
         result += prefix + '}'
         return result
 
-    members = dict(cls.__dict__)
+    members = class_members(cls)
     members.update({
         '__str__': to_string,
         '__repr__': to_string,
@@ -554,11 +674,410 @@ def printable_container(cls):
     new_class = type(cls.__name__, cls.__bases__, members)
     return new_class
 
+def column_member(element, name):
+    zpp_class = element.__zpp_class__
+    if name not in getattr(zpp_class, 'offsets', ()):
+        raise TypeError("Type '%s' has no member named '%s'." % (element.__name__, name))
+    member_type = getattr(element, name)
+    if not member_type.__zpp_class__.fundamental:
+        raise TypeError("Member '%s' of type '%s' is not fundamental." % (name, element.__name__))
+    return member_type, zpp_class.offsets[name]
+
+def read_column(data, element, name, numpy=False):
+    member_type, offset = column_member(element, name)
+    size = element.__zpp_class__.size
+    member_size = member_type.__zpp_class__.size
+    count = len(data) // size
+    if numpy:
+        return numpy_column(data, member_type, offset, size, count)
+    column = bytearray(count * member_size)
+    for byte in range(member_size):
+        column[byte::member_size] = data[offset + byte::size]
+    try:
+        result = array.array(member_type.tag[-1])
+    except ValueError:
+        result = None
+    if result is None or result.itemsize != member_size:
+        return list(struct.unpack('<%d%s' % (count, member_type.tag[-1]), column))
+    result.frombytes(column)
+    if sys.byteorder == 'big':
+        result.byteswap()
+    return result
+
+def numpy_column(data, member_type, offset, size, count):
+    import numpy
+    if not count:
+        return numpy.empty(0, dtype=member_type.tag)
+    return numpy.ndarray(shape=(count,), dtype=member_type.tag, buffer=data,
+                         offset=offset, strides=(size,))
+
+def write_column(data, element, name, values):
+    member_type, offset = column_member(element, name)
+    size = element.__zpp_class__.size
+    member_size = member_type.__zpp_class__.size
+    count = len(data) // size
+    if len(values) != count:
+        raise ValueError("Column size mismatch.")
+    try:
+        view = memoryview(values)
+    except TypeError:
+        view = None
+    if view is not None and view.format == member_type.tag[-1] and view.c_contiguous:
+        column = view.cast('B')
+    else:
+        column = struct.pack('<%d%s' % (count, member_type.tag[-1]), *values)
+    for byte in range(member_size):
+        data[offset + byte::size] = column[byte::member_size]
+
+def vector_index(vector, index):
+    count = len(vector)
+    if index < 0:
+        index += count
+    if not 0 <= index < count:
+        raise IndexError("Vector index out of range.")
+    return index
+
+def join_buffers(buffers):
+    return bytearray().join(buffers)
+
+def resized(data, start, stop, buffer):
+    if type(data) is bytearray:
+        try:
+            if start == len(data):
+                data += buffer
+            else:
+                data[start:stop] = buffer
+            return data
+        except BufferError:
+            pass
+    data = bytearray(data)
+    data[start:stop] = buffer
+    return data
+
+class InternedBytes(bytes):
+    encoding = None
+
+    def text(self, encoding):
+        if self.encoding != encoding:
+            self.string = bytes.decode(self, encoding)
+            self.encoding = encoding
+        return self.string
+
+class InternTable(object):
+    def __init__(self, capacity=4096):
+        self.capacity = capacity
+        self.entries = collections.OrderedDict()
+
+    def __call__(self, data, index, size):
+        payload = memoryview(data)[index : index + size].tobytes()
+        entry = self.entries.pop(payload, None)
+        if entry is None:
+            entry = InternedBytes(payload)
+            if len(self.entries) >= self.capacity:
+                self.entries.popitem(last=False)
+        self.entries[entry] = entry
+        return entry
+
+    def __len__(self):
+        return len(self.entries)
+
+    def clear(self):
+        self.entries.clear()
+
+def borrowed(obj):
+    return object.__getattribute__(obj, '__dict__').get('__zpp_borrowed__') is not None
+
+def linked(obj):
+    members = object.__getattribute__(obj, '__dict__')
+    return members.get('__zpp_borrowed__') is not None or '__zpp_cache_owner__' in members
+
+def borrow(view, owner, name, offset):
+    members = object.__getattribute__(owner, '__dict__')
+    if members.get('__zpp_borrowed__') is not None:
+        object.__setattr__(view, '__zpp_borrowed__', (owner, name, offset))
+    if '__zpp_cache_owner__' in members:
+        object.__setattr__(view, '__zpp_cache_owner__', owner)
+    return view
+
+def element_cursor(owner, name):
+    element = owner.element
+    zpp_class = element.__zpp_class__
+    size = zpp_class.size
+    length = len(object.__getattribute__(owner, name))
+    if not hasattr(zpp_class, 'cursor_type'):
+        for index in range(length // size):
+            yield owner[index]
+        return
+    view = zpp_class.cursor_type.__new__(zpp_class.cursor_type)
+    object.__setattr__(view, '__zpp_owner__', (owner, name))
+    for offset in range(0, length, size):
+        object.__setattr__(view, '__zpp_offset__', offset)
+        yield view
+
+def copy_on_write(obj, name):
+    members = object.__getattribute__(obj, '__dict__')
+    if '__zpp_cache_owner__' in members:
+        invalidate(obj)
+    data = object.__getattribute__(obj, name)
+    if type(data) is bytearray:
+        return data
+    borrowed = members.pop('__zpp_borrowed__', None)
+    if type(borrowed) is tuple:
+        owner, owner_name, offset = borrowed
+        data = memoryview(copy_on_write(owner, owner_name))[offset : offset + len(data)]
+    elif borrowed is not None or type(data) is not memoryview:
+        data = bytearray(data)
+    else:
+        return data
+    object.__setattr__(obj, name, data)
+    return data
+
+def writable_data(obj):
+    data = object.__getattribute__(obj, '__zpp_data__')
+    borrowed = object.__getattribute__(obj, '__dict__').pop('__zpp_borrowed__', None)
+    if type(data) is memoryview and not data.readonly and borrowed is None:
+        return data
+    data = bytearray(len(data))
+    object.__setattr__(obj, '__zpp_data__', data)
+    return data
+
+def invalidate(obj):
+    while obj is not None:
+        members = object.__getattribute__(obj, '__dict__')
+        if members.get('__zpp_cache__'):
+            members['__zpp_cache__'] = False
+        obj = members.get('__zpp_cache_owner__')
+
+def link_cache(obj, owner=None):
+    zpp_class = type(obj).__zpp_class__
+    if zpp_class.fundamental:
+        return
+    members = object.__getattribute__(obj, '__dict__')
+    if owner is not None:
+        members['__zpp_cache_owner__'] = owner
+    if members.get('__zpp_cache__') is not None:
+        owner = obj
+    if zpp_class.container:
+        for item in members.get('items', ()):
+            link_cache(item, owner)
+    elif not zpp_class.trivially_copyable:
+        for name in zpp_class.members:
+            if name in members:
+                link_cache(members[name], owner)
+
+def cache_class(cls):
+    zpp_class = cls.__zpp_class__
+    serialize = zpp_class.memory_serialize
+
+    def memory_serialize(self, archive):
+        cache = self.__zpp_cache__
+        index = archive.index
+        if cache:
+            archive.data[index : index + len(cache)] = cache
+            archive.index = index + len(cache)
+            return
+        serialize(self, archive)
+        if cache is False:
+            object.__setattr__(self, '__zpp_cache__',
+                               memoryview(archive.data)[index : archive.index].tobytes())
+            link_cache(self)
+
+    zpp_class.memory_serialize = staticmethod(memory_serialize)
+
+    for archive in input_archives:
+        function_name = '_'.join((archive.name, 'deserialize'))
+
+        def deserialize(self, archive, deserialize=getattr(zpp_class, function_name)):
+            invalidate(self)
+            return deserialize(self, archive)
+
+        setattr(zpp_class, function_name, staticmethod(deserialize))
+    zpp_class.cached = True
+
+def cached(obj):
+    zpp_class = type(obj).__zpp_class__
+    if not getattr(zpp_class, 'cacheable', False):
+        return obj
+    if not getattr(zpp_class, 'cached', False):
+        cache_class(type(obj))
+    if obj.__zpp_cache__ is None:
+        object.__setattr__(obj, '__zpp_cache__', False)
+    return obj
+
+def uncached(obj):
+    if getattr(type(obj).__zpp_class__, 'cacheable', False):
+        object.__setattr__(obj, '__zpp_cache__', None)
+    return obj
+
+class SerializationCache(object):
+    def __init__(self, capacity=1024):
+        self.capacity = capacity
+        self.entries = collections.OrderedDict()
+
+    def __call__(self, obj):
+        key = id(obj)
+        reference = self.entries.pop(key, None)
+        if reference is None:
+            cached(obj)
+            entries = self.entries
+            reference = weakref.ref(obj, lambda reference, key=key: entries.pop(key, None))
+        self.entries[key] = reference
+        while len(self.entries) > self.capacity:
+            key, reference = self.entries.popitem(last=False)
+            evicted = reference()
+            if evicted is not None:
+                uncached(evicted)
+        return obj
+
+    def __len__(self):
+        return len(self.entries)
+
+    def clear(self):
+        while self.entries:
+            key, reference = self.entries.popitem()
+            obj = reference()
+            if obj is not None:
+                uncached(obj)
+
+def registered_type(serialization_id):
+    return polymorphic.registry[serialization_id]
+
+def type_descriptor(cls):
+    if getattr(sys.modules.get(cls.__module__), cls.__name__, None) is cls:
+        return cls
+    zpp_class = cls.__zpp_class__
+    if hasattr(zpp_class, 'factory'):
+        factory, arguments = zpp_class.factory
+        return (factory, tuple(type_descriptor(argument) if isinstance(argument, type) else argument
+                               for argument in arguments))
+    if hasattr(zpp_class, 'serialization_id'):
+        return (registered_type, (zpp_class.serialization_id,))
+    return cls
+
+def resolve_type(descriptor):
+    if type(descriptor) is not tuple:
+        return descriptor
+    factory, arguments = descriptor
+    return factory(*[resolve_type(argument) for argument in arguments])
+
+def payload_name(cls):
+    zpp_class = cls.__zpp_class__
+    if zpp_class.trivially_copyable:
+        return '__zpp_data__'
+    if zpp_class.container and (cls.element.__zpp_class__.fundamental or
+                                cls.element.__zpp_class__.trivially_copyable):
+        return 'data'
+    return None
+
+def zpp_reduce(self, protocol):
+    cls = type(self)
+    descriptor = type_descriptor(cls)
+    name = payload_name(cls)
+    if protocol >= 5 and name is not None:
+        from pickle import PickleBuffer
+        return rebuild_buffer, (descriptor, PickleBuffer(object.__getattribute__(self, name)))
+    if protocol >= 5 and not cls.__zpp_class__.fundamental:
+        from pickle import PickleBuffer
+        archive = GatherOutputArchive()
+        archive(self)
+        if archive.references:
+            segments = []
+            start = 0
+            for index, buffer in archive.references:
+                segments += [bytes(archive.data[start:index]), PickleBuffer(buffer)]
+                start = index
+            segments.append(bytes(archive.data[start:archive.index]))
+            return rebuild_segments, (descriptor, segments)
+    data = bytearray()
+    MemoryOutputArchive(data)(self)
+    return rebuild, (descriptor, bytes(data))
+
+def rebuild(descriptor, data):
+    return rebuild_from(resolve_type(descriptor), MemoryInputArchive(data))
+
+def rebuild_segments(descriptor, segments):
+    return rebuild_from(resolve_type(descriptor), ChunkedInputArchive(segments))
+
+def rebuild_from(cls, archive):
+    if hasattr(cls.__zpp_class__, 'serialization_id'):
+        return archive(cls)
+    item = cls()
+    result = archive(item)
+    return item if result is None else result
+
+def rebuild_buffer(descriptor, buffer):
+    cls = resolve_type(descriptor)
+    item = cls.__new__(cls)
+    if type(buffer) is not bytearray:
+        buffer = memoryview(buffer)
+        if buffer.format != 'B' or buffer.ndim != 1:
+            buffer = buffer.cast('B')
+        if buffer.readonly:
+            object.__setattr__(item, '__zpp_borrowed__', True)
+    object.__setattr__(item, payload_name(cls), buffer)
+    return item
+
+def container_data(value, element):
+    if getattr(type(value), 'element', None) is not element:
+        return None
+    if type(value).__zpp_class__.trivially_copyable:
+        return value.__zpp_data__
+    return getattr(value, 'data', None)
+
+def slice_type(cls):
+    zpp_class = cls.__zpp_class__
+    if 'slice_type' not in zpp_class.__dict__:
+        zpp_class.slice_type = Vector(cls.element)
+    return zpp_class.slice_type
+
+def read_slice(cls, data, index, size):
+    start, stop, step = index.indices(len(data) // size)
+    result = cls.__new__(cls)
+    view = memoryview(data)
+    if step == 1:
+        result.data = view[start * size : max(start, stop) * size]
+        result.__zpp_borrowed__ = True
+    else:
+        result.data = join_buffers(view[position * size : (position + 1) * size]
+                                   for position in range(start, stop, step))
+    return result
+
+def write_slice(data, index, buffer, size):
+    start, stop, step = index.indices(len(data) // size)
+    if step == 1:
+        stop = max(start, stop)
+        if len(buffer) != (stop - start) * size:
+            return resized(data, start * size, stop * size, buffer)
+        data[start * size : stop * size] = buffer
+        return data
+    positions = range(start, stop, step)
+    if len(buffer) != len(positions) * size:
+        raise ValueError("Extended slice assignment size mismatch.")
+    view = memoryview(buffer)
+    for offset, position in enumerate(positions):
+        data[position * size : (position + 1) * size] = view[offset * size : (offset + 1) * size]
+    return data
+
+def slice_length(data, index, size):
+    start, stop, step = index.indices(len(data) // size)
+    return len(range(start, stop, step)) * size
+
 class make_vector(object):
     def __init__(self, cls):
         self.cls = cls
+        self.classes = {}
+
+    def __reduce__(self):
+        return self.cls.__name__
 
     def __call__(self, element):
+        cls = self.classes.get(element)
+        if cls is None:
+            cls = self.classes[element] = self.create(element)
+            cls.__zpp_class__.factory = (self, (element,))
+        return cls
+
+    def create(self, element):
         if element.__zpp_class__.fundamental:
             return self.fundamental_vector(element)
         elif element.__zpp_class__.trivially_copyable:
@@ -588,9 +1107,14 @@ class make_vector(object):
                 self.items = [self.element() for index in range(size)]
 
         def at(self, index):
+            if type(index) is slice:
+                result = type(self).__new__(type(self))
+                result.items = self.items[index]
+                return result
             return self.items[index]
 
         def assign(self, index, value):
+            invalidate(self)
             if type(index) is slice:
                 self.items[index] = [self.element.__zpp_class__.make(item) for item in value]
             else:
@@ -602,25 +1126,50 @@ class make_vector(object):
         def size(self):
             return len(self.items)
 
-        members = dict(self.cls.__dict__)
+        def append(self, value):
+            invalidate(self)
+            self.items.append(self.element.__zpp_class__.make(value))
+
+        def extend(self, values):
+            invalidate(self)
+            make = self.element.__zpp_class__.make
+            self.items.extend([make(value) for value in values])
+
+        def pop(self, index=-1):
+            invalidate(self)
+            return self.items.pop(index)
+
+        def resize(self, count):
+            invalidate(self)
+            if count < len(self.items):
+                del self.items[count:]
+            else:
+                self.items.extend(self.element() for index in range(count - len(self.items)))
+
+        members = class_members(self.cls)
         members.update({
             '__zpp_class__': type('zpp_class', (object,), {
                 'fundamental': False,
                 'container': True,
                 'trivially_copyable': False,
+                'cacheable': True,
             }),
             '__init__': constructor,
+            '__reduce_ex__': zpp_reduce,
             '__getitem__': at,
             '__setitem__': assign,
             '__iter__': iterate,
             '__len__': size,
+            'append': append,
+            'extend': extend,
+            'pop': pop,
+            'resize': resize,
             'element': element,
+            '__zpp_cache__': None,
         })
         
         cls = type(self.cls.__name__, self.cls.__bases__, members)
-        for archive in archives:
-            function_name, function = SerializationGenerator(cls, archive).generate_code()
-            setattr(cls.__zpp_class__, function_name, staticmethod(function))
+        generate_lazily(cls, archives)
 
         cls.__zpp_class__.make = staticmethod(lambda value: cls(value))
         cls.__zpp_class__.make_view = staticmethod(lambda value: value if type(value) == cls else cls(value))
@@ -642,6 +1191,11 @@ class make_vector(object):
                     values = count
                     count = len(values)
 
+            data = container_data(values, self.element)
+            if data is not None:
+                self.data = bytearray(data)
+                return
+
             size = self.element.__zpp_class__.size
             self.data = bytearray(size * count)
 
@@ -652,26 +1206,93 @@ class make_vector(object):
 
         def at(self, index):
             size = self.element.__zpp_class__.size
-            return self.element(__zpp_data__=memoryview(self.data)[index * size : (index + 1) * size])
+            if type(index) is slice:
+                return read_slice(type(self), self.data, index, size)
+            data = self.data
+            view = self.element(__zpp_data__=memoryview(data)[index * size : (index + 1) * size])
+            if linked(self):
+                borrow(view, self, 'data', index * size)
+            return view
 
         def assign(self, index, value):
+            copy_on_write(self, 'data')
             size = self.element.__zpp_class__.size
             if type(index) is slice:
-                for i, item in enumerate(value):
-                    self.data[(index.start + i) * size : (index.start + i + 1) * size] = \
-                            self.element.__zpp_class__.make_view(item).__zpp_data__
+                buffer = container_data(value, self.element)
+                if buffer is None:
+                    make_view = self.element.__zpp_class__.make_view
+                    buffer = join_buffers(make_view(item).__zpp_data__ for item in value)
+                self.data = write_slice(self.data, index, buffer, size)
             else:
                 self.data[index * size : (index + 1) * size] = \
                             self.element.__zpp_class__.make_view(value).__zpp_data__
 
         def iterate(self):
-            for index in range(len(self.data) // self.element.__zpp_class__.size):
-                yield self[index]
+            element = self.element
+            size = element.__zpp_class__.size
+            data = memoryview(self.data)
+            if not linked(self):
+                for offset in range(0, len(data), size):
+                    yield element(__zpp_data__=data[offset : offset + size])
+                return
+            for offset in range(0, len(data), size):
+                yield borrow(element(__zpp_data__=data[offset : offset + size]), self, 'data', offset)
+
+        def cursor(self):
+            return element_cursor(self, 'data')
 
         def size(self):
             return len(self.data) // self.element.__zpp_class__.size
 
-        members = dict(self.cls.__dict__)
+        def append(self, value):
+            buffer = self.element.__zpp_class__.make_view(value).__zpp_data__
+            data = self.data
+            if type(data) is bytearray and not linked(self):
+                try:
+                    data += buffer
+                    return
+                except BufferError:
+                    pass
+            self.data = resized(copy_on_write(self, 'data'), len(data), len(data), buffer)
+
+        def extend(self, values):
+            if type(values) is type(self):
+                buffer = values.data
+            elif isinstance(values, (bytes, bytearray, memoryview)):
+                buffer = memoryview(values)
+                if len(buffer) * buffer.itemsize % self.element.__zpp_class__.size:
+                    raise ValueError("Buffer size is not a multiple of the element size.")
+            else:
+                make_view = self.element.__zpp_class__.make_view
+                buffer = join_buffers(make_view(value).__zpp_data__ for value in values)
+            data = copy_on_write(self, 'data')
+            length = len(data)
+            self.data = resized(data, length, length, buffer)
+
+        def pop(self, index=-1):
+            size = self.element.__zpp_class__.size
+            index = vector_index(self, index)
+            data = copy_on_write(self, 'data')
+            value = self.element(__zpp_data__=bytearray(data[index * size : (index + 1) * size]))
+            self.data = resized(data, index * size, (index + 1) * size, b'')
+            return value
+
+        def resize(self, count):
+            data = copy_on_write(self, 'data')
+            length = len(data)
+            size = count * self.element.__zpp_class__.size
+            if size < length:
+                self.data = resized(data, size, length, b'')
+            else:
+                self.data = resized(data, length, length, bytearray(size - length))
+
+        def column(self, name, numpy=False):
+            return read_column(self.data, self.element, name, numpy)
+
+        def set_column(self, name, values):
+            write_column(copy_on_write(self, 'data'), self.element, name, values)
+
+        members = class_members(self.cls)
         members.update({
             '__zpp_class__': type('zpp_class', (object,), {
                 'fundamental': False,
@@ -679,17 +1300,23 @@ class make_vector(object):
                 'trivially_copyable': False,
             }),
             '__init__': constructor,
+            '__reduce_ex__': zpp_reduce,
             '__getitem__': at,
             '__setitem__': assign,
             '__iter__': iterate,
             '__len__': size,
+            'cursor': cursor,
+            'column': column,
+            'set_column': set_column,
+            'append': append,
+            'extend': extend,
+            'pop': pop,
+            'resize': resize,
             'element': element,
         })
 
         cls = type(self.cls.__name__, self.cls.__bases__, members)
-        for archive in archives:
-            function_name, function = SerializationGenerator(cls, archive).generate_code()
-            setattr(cls.__zpp_class__, function_name, staticmethod(function))
+        generate_lazily(cls, archives)
 
         cls.__zpp_class__.make = staticmethod(lambda value: cls(value))
         cls.__zpp_class__.make_view = staticmethod(lambda value: value if type(value) == cls else cls(value))
@@ -711,34 +1338,86 @@ class make_vector(object):
                     values = count
                     count = len(values)
 
+            data = container_data(values, self.element)
+            if data is not None:
+                self.data = bytearray(data)
+                return
+
             self.data = bytearray(count * self.element.__zpp_class__.size)
-            out = MemoryOutputArchive(self.data, index=0)
-            for value in values:
-                out(self.element.__zpp_class__.make_view(value))
+            if values:
+                struct.pack_into('<%d%s' % (count, self.element.tag[-1]), self.data, 0, *values)
 
         def at(self, index):
             size = self.element.__zpp_class__.size
+            if type(index) is slice:
+                return read_slice(type(self), self.data, index, size)
             return self.element(self.element.deserialize(
                 memoryview(self.data)[index * size : (index + 1) * size])[0])
 
         def assign(self, index, value):
+            copy_on_write(self, 'data')
             size = self.element.__zpp_class__.size
             if type(index) is slice:
-                for i, item in enumerate(value):
-                    self.data[(index.start + i) * size : (index.start + i + 1) * size] = \
-                            self.element.serialize(self.element.__zpp_class__.make_view(item))
+                buffer = container_data(value, self.element)
+                if buffer is None:
+                    value = list(value)
+                    buffer = struct.pack('<%d%s' % (len(value), self.element.tag[-1]), *value)
+                self.data = write_slice(self.data, index, buffer, size)
             else:
                 self.data[index * size : (index + 1) * size] = \
                             self.element.serialize(self.element.__zpp_class__.make_view(value))
 
         def iterate(self):
-            for index in range(len(self.data) // self.element.__zpp_class__.size):
-                yield self[index]
+            element = self.element
+            for value, in element.iter_deserialize(self.data):
+                yield element(value)
 
         def size(self):
             return len(self.data) // self.element.__zpp_class__.size
 
-        members = dict(self.cls.__dict__)
+        def append(self, value):
+            buffer = self.element.serialize(self.element.__zpp_class__.make_view(value))
+            data = self.data
+            if type(data) is bytearray and not linked(self):
+                try:
+                    data += buffer
+                    return
+                except BufferError:
+                    pass
+            self.data = resized(copy_on_write(self, 'data'), len(data), len(data), buffer)
+
+        def extend(self, values):
+            if type(values) is type(self):
+                buffer = values.data
+            elif isinstance(values, (bytes, bytearray, memoryview)):
+                buffer = memoryview(values)
+                if len(buffer) * buffer.itemsize % self.element.__zpp_class__.size:
+                    raise ValueError("Buffer size is not a multiple of the element size.")
+            else:
+                if not isinstance(values, (list, tuple)):
+                    values = list(values)
+                buffer = struct.pack('<%d%s' % (len(values), self.element.tag[-1]), *values)
+            data = copy_on_write(self, 'data')
+            length = len(data)
+            self.data = resized(data, length, length, buffer)
+
+        def pop(self, index=-1):
+            size = self.element.__zpp_class__.size
+            index = vector_index(self, index)
+            value = self[index]
+            self.data = resized(copy_on_write(self, 'data'), index * size, (index + 1) * size, b'')
+            return value
+
+        def resize(self, count):
+            data = copy_on_write(self, 'data')
+            length = len(data)
+            size = count * self.element.__zpp_class__.size
+            if size < length:
+                self.data = resized(data, size, length, b'')
+            else:
+                self.data = resized(data, length, length, bytearray(size - length))
+
+        members = class_members(self.cls)
         members.update({
             '__zpp_class__': type('zpp_class', (object,), {
                 'fundamental': False,
@@ -746,17 +1425,20 @@ class make_vector(object):
                 'trivially_copyable': False,
             }),
             '__init__': constructor,
+            '__reduce_ex__': zpp_reduce,
             '__getitem__': at,
             '__setitem__': assign,
             '__iter__': iterate,
             '__len__': size,
+            'append': append,
+            'extend': extend,
+            'pop': pop,
+            'resize': resize,
             'element': element,
         })
 
         cls = type(self.cls.__name__, self.cls.__bases__, members)
-        for archive in archives:
-            function_name, function = SerializationGenerator(cls, archive).generate_code()
-            setattr(cls.__zpp_class__, function_name, staticmethod(function))
+        generate_lazily(cls, archives)
 
         cls.__zpp_class__.make = staticmethod(lambda value: cls(value))
         cls.__zpp_class__.make_view = staticmethod(lambda value: value if type(value) == cls else cls(value))
@@ -765,8 +1447,19 @@ class make_vector(object):
 class make_array(object):
     def __init__(self, cls):
         self.cls = cls
+        self.classes = {}
+
+    def __reduce__(self):
+        return self.cls.__name__
 
     def __call__(self, element, size):
+        cls = self.classes.get((element, size))
+        if cls is None:
+            cls = self.classes[element, size] = self.create(element, size)
+            cls.__zpp_class__.factory = (self, (element, size))
+        return cls
+
+    def create(self, element, size):
         if element.__zpp_class__.fundamental:
             return self.fundamental_array(element, size)
         elif element.__zpp_class__.trivially_copyable:
@@ -784,9 +1477,15 @@ class make_array(object):
                 self.items = [self.element() for index in range(array_size)]
 
         def at(self, index):
+            if type(index) is slice:
+                vector = slice_type(type(self))
+                result = vector.__new__(vector)
+                result.items = self.items[index]
+                return result
             return self.items[index]
 
         def assign(self, index, value):
+            invalidate(self)
             if type(index) is slice:
                 if index.stop > array_size:
                     raise ValueError("This operation will adjust the length of the array.")
@@ -800,26 +1499,27 @@ class make_array(object):
         def size(self):
             return len(self.items)
 
-        members = dict(self.cls.__dict__)
+        members = class_members(self.cls)
         members.update({
             '__zpp_class__': type('zpp_class', (object,), {
                 'fundamental': False,
                 'container': True,
                 'trivially_copyable': False,
+                'cacheable': True,
                 'array_size': array_size,
             }),
             '__init__': constructor,
+            '__reduce_ex__': zpp_reduce,
             '__getitem__': at,
             '__setitem__': assign,
             '__iter__': iterate,
             '__len__': size,
             'element': element,
+            '__zpp_cache__': None,
         })
 
         cls = type(self.cls.__name__, self.cls.__bases__, members)
-        for archive in archives:
-            function_name, function = SerializationGenerator(cls, archive).generate_code()
-            setattr(cls.__zpp_class__, function_name, staticmethod(function))
+        generate_lazily(cls, archives)
 
         cls.__zpp_class__.make = staticmethod(lambda value: cls(value))
         cls.__zpp_class__.make_view = staticmethod(lambda value: value if type(value) == cls else cls(value))
@@ -834,7 +1534,12 @@ class make_array(object):
             else:
                 self.__zpp_data__ = bytearray(array_size * self.element.__zpp_class__.size)
 
-            if values:
+            data = container_data(values, self.element)
+            if data is not None:
+                if len(data) != len(self.__zpp_data__):
+                    raise ValueError("Array size mismatch.")
+                self.__zpp_data__[:] = data
+            elif values:
                 if len(values) != array_size:
                     raise ValueError("Array size mismatch.")
                 size = self.element.__zpp_class__.size
@@ -844,16 +1549,25 @@ class make_array(object):
 
         def at(self, index):
             size = self.element.__zpp_class__.size
-            return self.element(__zpp_data__=memoryview(self.__zpp_data__)[index * size : (index + 1) * size])
+            if type(index) is slice:
+                return read_slice(slice_type(type(self)), self.__zpp_data__, index, size)
+            data = self.__zpp_data__
+            view = self.element(__zpp_data__=memoryview(data)[index * size : (index + 1) * size])
+            if linked(self):
+                borrow(view, self, '__zpp_data__', index * size)
+            return view
 
         def assign(self, index, value):
+            copy_on_write(self, '__zpp_data__')
             size = self.element.__zpp_class__.size
             if type(index) is slice:
-                if index.stop > array_size:
+                buffer = container_data(value, self.element)
+                if buffer is None:
+                    make_view = self.element.__zpp_class__.make_view
+                    buffer = join_buffers(make_view(item).__zpp_data__ for item in value)
+                if len(buffer) != slice_length(self.__zpp_data__, index, size):
                     raise ValueError("This operation will adjust the length of the array.")
-                for i, item in enumerate(value):
-                    self.__zpp_data__[(index.start + i) * size : (index.start + i + 1) * size] = \
-                            self.element.__zpp_class__.make_view(item).__zpp_data__
+                write_slice(self.__zpp_data__, index, buffer, size)
             else:
                 if index > array_size:
                     raise ValueError("This operation will adjust the length of the array.")
@@ -861,13 +1575,29 @@ class make_array(object):
                             self.element.__zpp_class__.make_view(value).__zpp_data__
 
         def iterate(self):
-            for index in range(len(self.__zpp_data__) // self.element.__zpp_class__.size):
-                yield self[index]
+            element = self.element
+            size = element.__zpp_class__.size
+            data = memoryview(self.__zpp_data__)
+            if not linked(self):
+                for offset in range(0, len(data), size):
+                    yield element(__zpp_data__=data[offset : offset + size])
+                return
+            for offset in range(0, len(data), size):
+                yield borrow(element(__zpp_data__=data[offset : offset + size]), self, '__zpp_data__', offset)
+
+        def cursor(self):
+            return element_cursor(self, '__zpp_data__')
 
         def size(self):
             return len(self.__zpp_data__) // self.element.__zpp_class__.size
 
-        members = dict(self.cls.__dict__)
+        def column(self, name, numpy=False):
+            return read_column(self.__zpp_data__, self.element, name, numpy)
+
+        def set_column(self, name, values):
+            write_column(copy_on_write(self, '__zpp_data__'), self.element, name, values)
+
+        members = class_members(self.cls)
         members.update({
             '__zpp_class__': type('zpp_class', (object,), {
                 'fundamental': False,
@@ -876,17 +1606,19 @@ class make_array(object):
                 'size': array_size * element.__zpp_class__.size,
             }),
             '__init__': constructor,
+            '__reduce_ex__': zpp_reduce,
             '__getitem__': at,
             '__setitem__': assign,
             '__iter__': iterate,
             '__len__': size,
+            'cursor': cursor,
+            'column': column,
+            'set_column': set_column,
             'element': element,
         })
 
         cls = type(self.cls.__name__, self.cls.__bases__, members)
-        for archive in archives:
-            function_name, function = SerializationGenerator(cls, archive).generate_code()
-            setattr(cls.__zpp_class__, function_name, staticmethod(function))
+        generate_lazily(cls, archives)
 
         cls.__zpp_class__.make = staticmethod(lambda value: cls(value))
         cls.__zpp_class__.make_view = staticmethod(lambda value: value if type(value) == cls else cls(value))
@@ -901,26 +1633,35 @@ class make_array(object):
             else:
                 self.__zpp_data__ = bytearray(array_size * self.element.__zpp_class__.size)
 
-            if values:
+            data = container_data(values, self.element)
+            if data is not None:
+                if len(data) != len(self.__zpp_data__):
+                    raise ValueError("Array size mismatch.")
+                self.__zpp_data__[:] = data
+            elif values:
                 if len(values) != array_size:
                     raise ValueError("Array size mismatch.")
-                out = MemoryOutputArchive(self.__zpp_data__, index=0)
-                for value in values:
-                    out(self.element(value))
+                struct.pack_into('<%d%s' % (array_size, self.element.tag[-1]),
+                                 self.__zpp_data__, 0, *values)
 
         def at(self, index):
             size = self.element.__zpp_class__.size
+            if type(index) is slice:
+                return read_slice(slice_type(type(self)), self.__zpp_data__, index, size)
             return self.element(self.element.deserialize(
                 memoryview(self.__zpp_data__)[index * size : (index + 1) * size])[0])
 
         def assign(self, index, value):
+            copy_on_write(self, '__zpp_data__')
             size = self.element.__zpp_class__.size
             if type(index) is slice:
-                if index.stop > array_size:
+                buffer = container_data(value, self.element)
+                if buffer is None:
+                    value = list(value)
+                    buffer = struct.pack('<%d%s' % (len(value), self.element.tag[-1]), *value)
+                if len(buffer) != slice_length(self.__zpp_data__, index, size):
                     raise ValueError("This operation will adjust the length of the array.")
-                for i, item in enumerate(value):
-                    self.__zpp_data__[(index.start + i) * size : (index.start + i + 1) * size] = \
-                            self.element.serialize(self.element(item))
+                write_slice(self.__zpp_data__, index, buffer, size)
             else:
                 if index > array_size:
                     raise ValueError("This operation will adjust the length of the array.")
@@ -928,13 +1669,14 @@ class make_array(object):
                             self.element.serialize(self.element(value))
 
         def iterate(self):
-            for index in range(len(self.__zpp_data__) // self.element.__zpp_class__.size):
-                yield self[index]
+            element = self.element
+            for value, in element.iter_deserialize(self.__zpp_data__):
+                yield element(value)
 
         def size(self):
             return len(self.__zpp_data__) // self.element.__zpp_class__.size
 
-        members = dict(self.cls.__dict__)
+        members = class_members(self.cls)
         members.update({
             '__zpp_class__': type('zpp_class', (object,), {
                 'fundamental': False,
@@ -943,6 +1685,7 @@ class make_array(object):
                 'size': array_size * element.__zpp_class__.size,
             }),
             '__init__': constructor,
+            '__reduce_ex__': zpp_reduce,
             '__getitem__': at,
             '__setitem__': assign,
             '__iter__': iterate,
@@ -951,9 +1694,7 @@ class make_array(object):
         })
 
         cls = type(self.cls.__name__, self.cls.__bases__, members)
-        for output_archive in output_archives:
-            function_name, function = SerializationGenerator(cls, archive).generate_code()
-            setattr(cls.__zpp_class__, function_name, staticmethod(function))
+        generate_lazily(cls, archives)
 
         cls.__zpp_class__.make = staticmethod(lambda value: cls(value))
         cls.__zpp_class__.make_view = staticmethod(lambda value: value if type(value) == cls else cls(value))
@@ -962,34 +1703,61 @@ class make_array(object):
 class make_basic_string(object):
     def __init__(self, cls):
         self.cls = cls
+        self.classes = {}
+
+    def __reduce__(self):
+        return self.cls.__name__
 
     def __call__(self, element):
+        cls = self.classes.get(element)
+        if cls is None:
+            cls = self.classes[element] = self.create(element)
+            cls.__zpp_class__.factory = (self, (element,))
+        return cls
+
+    def create(self, element):
         cls = Vector(element)
 
         def constructor(self, values=[]):
-            self.data = bytearray(len(values))
-            out = MemoryOutputArchive(self.data, index=0)
-            for value in values:
-                out(self.element(ord(value)))
+            data = container_data(values, self.element)
+            if data is not None:
+                self.data = bytearray(data)
+                return
+
+            self.data = bytearray(len(values) * self.element.__zpp_class__.size)
+            struct.pack_into('<%d%s' % (len(values), self.element.tag[-1]), self.data, 0,
+                             *[ord(value) for value in values])
 
         def at(self, index):
             size = self.element.__zpp_class__.size
+            if type(index) is slice:
+                return read_slice(type(self), self.data, index, size)
             return chr(self.element.deserialize(
                 memoryview(self.data)[index * size : (index + 1) * size])[0])
 
         def assign(self, index, value):
+            copy_on_write(self, 'data')
             size = self.element.__zpp_class__.size
             if type(index) is slice:
-                for i, item in enumerate(value):
-                    self.data[(index.start + i) * size : (index.start + i + 1) * size] = \
-                            self.element.serialize(self.element(ord(item)))
+                buffer = container_data(value, self.element)
+                if buffer is None:
+                    buffer = struct.pack('<%d%s' % (len(value), self.element.tag[-1]),
+                                         *[ord(item) for item in value])
+                self.data = write_slice(self.data, index, buffer, size)
             else:
                 self.data[index * size : (index + 1) * size] = \
                             self.element.serialize(self.element(ord(value)))
 
+        def iterate(self):
+            for value, in self.element.iter_deserialize(self.data):
+                yield chr(value)
+
         def to_string(self, level=0, name=None):
             prefix = ' ' * level * 4
-            string = self.data.decode(self.encoding)
+            if type(self.data) is InternedBytes:
+                string = self.data.text(self.encoding)
+            else:
+                string = str(self.data, self.encoding)
             if not level:
                 return string
             if name:
@@ -1000,11 +1768,13 @@ class make_basic_string(object):
                         "('" + string + "')"
             return result
 
-        members = dict(cls.__dict__)
+        members = class_members(cls)
         members.update({
+            '__zpp_class__': type('zpp_class', (cls.__zpp_class__,), {}),
             '__init__': constructor,
             '__getitem__': at,
             '__setitem__': assign,
+            '__iter__': iterate,
             '__str__': to_string,
             '__repr__': to_string,
             'encoding': 'ascii' if element.__zpp_class__.size == 1 else 'utf-16',
@@ -1021,6 +1791,55 @@ class make_basic_string(object):
         cls.__zpp_class__.make_view = staticmethod(lambda value: value if type(value) == cls else cls(value))
         return cls
 
+class make_bytes(object):
+    def __init__(self, cls):
+        self.cls = cls
+
+    def __call__(self):
+        cls = Vector(Uint8)
+
+        def constructor(self, value=b''):
+            data = container_data(value, self.element)
+            if data is not None:
+                value = data
+            if isinstance(value, bytes):
+                self.data = value
+                return
+            try:
+                view = memoryview(value)
+            except TypeError:
+                self.data = bytearray(value)
+                return
+            self.data = view if view.format == 'B' and view.ndim == 1 else view.cast('B')
+            self.__zpp_borrowed__ = True
+
+        def to_bytes(self):
+            return bytes(self.data)
+
+        def to_string(self, level=0, name=None):
+            prefix = ' ' * level * 4
+            if name:
+                return prefix + name + ": class " + type(self).__name__ + \
+                        "(%d bytes)" % len(self.data)
+            return prefix + "class " + type(self).__name__ + "(%d bytes)" % len(self.data)
+
+        members = class_members(cls)
+        members.update({
+            '__zpp_class__': type('zpp_class', (cls.__zpp_class__,), {}),
+            '__init__': constructor,
+            '__bytes__': to_bytes,
+            '__str__': to_string,
+            '__repr__': to_string,
+        })
+
+        cls = type('Bytes', cls.__bases__, members)
+        cls.__zpp_class__.view = True
+        generate_lazily(cls, archives)
+
+        cls.__zpp_class__.make = staticmethod(lambda value: cls(value))
+        cls.__zpp_class__.make_view = staticmethod(lambda value: value if type(value) == cls else cls(value))
+        return cls
+
 @make_vector
 @printable_container
 class Vector(object):
@@ -1035,6 +1854,10 @@ class Array(object):
 class BasicString(object):
     pass
 
+@make_bytes
+class BasicBytes(object):
+    pass
+
 class BasicMemoryArchiveCodeGenerator(object):
     def __init__(self, code):
         self.code = code
@@ -1063,6 +1886,7 @@ class BasicMemoryArchiveCodeGenerator(object):
         self.code += [
             'index = archive.index'
         ]
+        self.index = 0
 
     def generate_enter_loop(self):
         self.loop += 1
@@ -1157,6 +1981,193 @@ class MemoryOutputArchive(object):
     def reset(self, index):
         self.index = index
 
+    def serialize_parallel(self, container, workers=None, chunk_size=4096):
+        element = container.element.__zpp_class__
+        if element.fundamental or element.trivially_copyable:
+            return self(container)
+
+        items = container.items
+        count = len(items)
+        ranges = [(begin, min(begin + chunk_size, count)) for begin in range(0, count, chunk_size)]
+        header = b'' if hasattr(container.__zpp_class__, 'array_size') else \
+            SizeType.serialize(SizeType(count))
+
+        def measure(bounds):
+            return SizeArchive()(*items[bounds[0]:bounds[1]])
+
+        def serialize(arguments):
+            (begin, end), index = arguments
+            MemoryOutputArchive(view, index)(*items[begin:end])
+
+        import multiprocessing.pool
+        pool = multiprocessing.pool.ThreadPool(workers)
+        try:
+            index = self.index + len(header)
+            indices = []
+            for length in pool.map(measure, ranges):
+                indices.append(index)
+                index += length
+            if len(self.data) < index:
+                if type(self.data) is not bytearray:
+                    raise OverflowError("Serialized size %d exceeds the %d bytes left in the buffer." % (
+                        index - self.index, len(self.data) - self.index))
+                self.data += bytearray(index - len(self.data))
+            view = memoryview(self.data)
+            view[self.index : self.index + len(header)] = header
+            pool.map(serialize, list(zip(ranges, indices)))
+        finally:
+            pool.close()
+            pool.join()
+        self.index = index
+
+class FixedMemoryOutputArchive(MemoryOutputArchive):
+    def __init__(self, data, index=0):
+        view = memoryview(data)
+        if view.format != 'B' or view.ndim != 1:
+            view = view.cast('B')
+        super(FixedMemoryOutputArchive, self).__init__(view, index=index)
+        self.sizes = SizeArchive()
+
+    def __call__(self, *args):
+        sizes = self.sizes
+        for item in args:
+            zpp_class = type(item).__zpp_class__
+            sizes.index = 0
+            zpp_class.size_serialize(item, sizes)
+            if self.index + sizes.index > len(self.data):
+                raise OverflowError("Serialized size %d exceeds the %d bytes left in the buffer." % (
+                    sizes.index, len(self.data) - self.index))
+            zpp_class.memory_serialize(item, self)
+
+class OutputBuffer(MemoryOutputArchive):
+    def __init__(self, capacity=0):
+        super(OutputBuffer, self).__init__(bytearray(capacity), index=0)
+
+    def __call__(self, *args):
+        capacity = len(self.data)
+        super(OutputBuffer, self).__call__(*args)
+        if self.index > capacity:
+            self.reserve(2 * self.index)
+
+    def __len__(self):
+        return self.index
+
+    @property
+    def capacity(self):
+        return len(self.data)
+
+    def reserve(self, capacity):
+        if capacity > len(self.data):
+            self.data += bytearray(max(capacity, 2 * len(self.data)) - len(self.data))
+
+    def clear(self):
+        self.index = 0
+
+    def getbuffer(self):
+        return memoryview(self.data)[:self.index]
+
+    def getvalue(self):
+        return bytes(self.data[:self.index])
+
+class GatherOutputArchive(object):
+    name = "gather"
+
+    class CodeGenerator(MemoryOutputArchive.CodeGenerator):
+        def __init__(self, code):
+            super(GatherOutputArchive.CodeGenerator, self).__init__(code)
+
+        def generate_start(self):
+            super(GatherOutputArchive.CodeGenerator, self).generate_start()
+            self.code += [
+                'threshold = archive.threshold'
+            ]
+
+        def generate(self, member_type, variable_name, context=None):
+            if hasattr(member_type, '__zpp_class__'):
+                return super(GatherOutputArchive.CodeGenerator, self).generate(
+                    member_type, variable_name, context)
+
+            self.code += [
+                'size = len({variable_name})' '\n'
+                'if size < threshold:' '\n'
+                '    data[index{index} : index{index} + size] = {variable_name}' '\n'
+                '    index += size{index}' '\n'
+                'else:' '\n'
+                '    archive.gather(index{index}, {variable_name})' '\n'
+                '    index += {static_index}'.format(variable_name=variable_name,
+                                                    index=self._index_string(),
+                                                    static_index=self.index)
+            ]
+            self.index = 0
+
+    def __init__(self, data=None, threshold=4096):
+        self.data = data if data is not None else bytearray()
+        self.index = len(self.data)
+        self.threshold = threshold
+        self.references = []
+
+    def __call__(self, *args):
+        for item in args:
+            type(item).__zpp_class__.gather_serialize(item, self)
+
+    def __len__(self):
+        return self.index + sum(len(buffer) for index, buffer in self.references)
+
+    def gather(self, index, buffer):
+        self.references.append((index, buffer))
+
+    def buffers(self):
+        data = memoryview(self.data)
+        result = []
+        start = 0
+        for index, buffer in self.references:
+            if index > start:
+                result.append(data[start:index])
+            result.append(buffer)
+            start = index
+        if self.index > start:
+            result.append(data[start:self.index])
+        return result
+
+    def clear(self):
+        del self.data[:]
+        self.index = 0
+        self.references = []
+
+class SizeArchive(object):
+    name = "size"
+
+    class CodeGenerator(BasicMemoryArchiveCodeGenerator):
+        def __init__(self, code):
+            super(SizeArchive.CodeGenerator, self).__init__(code)
+
+        def generate_start(self):
+            self.code += [
+                'index = archive.index'
+            ]
+
+        def generate(self, member_type, variable_name, context=None):
+            if not hasattr(member_type, '__zpp_class__'):
+                self.code.append_with_tag({'index_addition_optimization': ('size', self.index)}, [
+                    'size = len({variable_name})' '\n'
+                    'index += size{index}'.format(variable_name=variable_name,
+                                                  index=self._index_string())
+                ])
+                self.index = 0
+            elif member_type.__zpp_class__.fundamental or \
+                    member_type.__zpp_class__.trivially_copyable:
+                self.index += member_type.__zpp_class__.size
+            else:
+                raise TypeError('Invalid argument of type %s.' % (member_type.__name__,))
+
+    def __init__(self, index=0):
+        self.index = index
+
+    def __call__(self, *args):
+        for item in args:
+            type(item).__zpp_class__.size_serialize(item, self)
+        return self.index
+
 class MemoryInputArchive(object):
     name = "memory"
 
@@ -1165,12 +2176,26 @@ class MemoryInputArchive(object):
             super(MemoryInputArchive.CodeGenerator, self).__init__(code)
 
         def generate(self, member_type, variable_name, context=None):
-            if context and hasattr(context, 'container_element_size'):
+            if context and getattr(context, 'container_view', False):
+                self.code.append_with_tag({'index_addition_optimization': ('size', self.index)}, [
+                    'size = container_size * {size}' '\n'
+                    '{variable_name} = '
+                        'memoryview(data)[index{index} : index{index} + size]' '\n'
+                    '{borrowed}'
+                    'index += size{index}'.format(variable_name=variable_name,
+                                                  borrowed=self._borrowed_string(variable_name),
+                                                  size=context.container_element_size,
+                                                  index=self._index_string())
+                ])
+                self.index = 0
+            elif context and hasattr(context, 'container_element_size'):
                 self.code.append_with_tag({'index_addition_optimization': ('size', self.index)}, [
                     'size = container_size * {size}' '\n'
+                    '{owned}'
                     '{variable_name}[:] = '
                         'memoryview(data)[index{index} : index{index} + size]' '\n'
                     'index += size{index}'.format(variable_name=variable_name,
+                                                  owned=self._owned_string(variable_name),
                                                   size=context.container_element_size,
                                                   index=self._index_string())
                 ])
@@ -1198,6 +2223,8 @@ class MemoryInputArchive(object):
             elif member_type.__zpp_class__.trivially_copyable:
                 size = member_type.__zpp_class__.size
                 self.code += [
+                    'if type({variable_name}.__zpp_data__) is not bytearray:' '\n'
+                    '    writable_data({variable_name})' '\n'
                     '{variable_name}.__zpp_data__[:] = '
                         'memoryview(data)[index{index} : index{index_plus_size}]'.format(
                             variable_name=variable_name,
@@ -1208,6 +2235,18 @@ class MemoryInputArchive(object):
             else:
                 raise TypeError('Invalid argument of type %s.' % (member_type.__name__,))
 
+        def _borrowed_string(self, variable_name):
+            return '{owner}.__zpp_borrowed__ = {variable_name}.readonly or None' '\n' \
+                'if not {variable_name}.readonly:' '\n' \
+                '    {variable_name} = bytearray({variable_name})' '\n'.format(
+                    variable_name=variable_name, owner=variable_name.rsplit('.', 1)[0])
+
+        def _owned_string(self, variable_name):
+            return 'if type({variable_name}) is not bytearray:' '\n' \
+                '    {variable_name} = bytearray()' '\n' \
+                '    {owner}.__zpp_borrowed__ = None' '\n'.format(
+                    variable_name=variable_name, owner=variable_name.rsplit('.', 1)[0])
+
     def __init__(self, data, index=0):
         self.data = data
         self.index = index
@@ -1219,6 +2258,1338 @@ class MemoryInputArchive(object):
     def reset(self, index):
         self.index = index
 
+    def fill(self, index, size):
+        return self.data, index
+
+    def iter_vector(self, element, chunk_size=None):
+        header_size = SizeType.__zpp_class__.size
+        data, index = self.fill(self.index, header_size)
+        self.index = index + header_size
+        count = SizeType.deserialize(memoryview(data)[index : self.index])[0]
+        zpp_class = element.__zpp_class__
+        if zpp_class.fundamental and chunk_size:
+            for position in range(0, count, chunk_size):
+                size = min(chunk_size, count - position) * zpp_class.size
+                data, index = self.fill(self.index, size)
+                self.index = index + size
+                yield memoryview(data)[index : self.index].cast(element.tag[-1])
+        elif zpp_class.fundamental:
+            size = zpp_class.size
+            for position in range(count):
+                data, index = self.fill(self.index, size)
+                self.index = index + size
+                yield element(element.deserialize(memoryview(data)[index : self.index])[0])
+        elif zpp_class.trivially_copyable:
+            size = zpp_class.size
+            for position in range(count):
+                data, index = self.fill(self.index, size)
+                self.index = index + size
+                item = element(__zpp_data__=memoryview(data)[index : self.index])
+                object.__setattr__(item, '__zpp_borrowed__', True)
+                yield item
+        else:
+            polymorphic = hasattr(zpp_class, 'serialization_id')
+            for position in range(count):
+                item = element if polymorphic else element()
+                result = self(item)
+                yield item if result is None else result
+
+class ViewInputArchive(MemoryInputArchive):
+    name = "view"
+
+    class CodeGenerator(MemoryInputArchive.CodeGenerator):
+        def __init__(self, code):
+            super(ViewInputArchive.CodeGenerator, self).__init__(code)
+
+        def generate(self, member_type, variable_name, context=None):
+            if context and hasattr(context, 'container_element_size'):
+                self.code.append_with_tag({'index_addition_optimization': ('size', self.index)}, [
+                    'size = container_size * {size}' '\n'
+                    '{variable_name} = data[index{index} : index{index} + size]' '\n'
+                    '{owner}.__zpp_borrowed__ = True' '\n'
+                    'index += size{index}'.format(variable_name=variable_name,
+                                                  owner=variable_name.rsplit('.', 1)[0],
+                                                  size=context.container_element_size,
+                                                  index=self._index_string())
+                ])
+                self.index = 0
+            elif hasattr(member_type, '__zpp_class__') and \
+                    not member_type.__zpp_class__.fundamental and \
+                    member_type.__zpp_class__.trivially_copyable:
+                size = member_type.__zpp_class__.size
+                self.code += [
+                    '{variable_name}.__zpp_data__ = data[index{index} : index{index_plus_size}]' '\n'
+                    '{variable_name}.__zpp_borrowed__ = True'.format(
+                            variable_name=variable_name,
+                            index=self._index_string(),
+                            index_plus_size=self._index_plus_size_string(size))
+                ]
+                self.index += size
+            else:
+                super(ViewInputArchive.CodeGenerator, self).generate(member_type, variable_name, context)
+
+    def __init__(self, data, index=0):
+        view = memoryview(data)
+        if view.format != 'B' or view.ndim != 1:
+            view = view.cast('B')
+        super(ViewInputArchive, self).__init__(view.toreadonly(), index=index)
+
+    def __call__(self, *args):
+        return tuple(item.__zpp_class__.view_deserialize(item, self) for item in args) if \
+            len(args) > 1 else args[0].__zpp_class__.view_deserialize(args[0], self)
+
+class ChunkedInputArchive(MemoryInputArchive):
+    name = "chunked"
+
+    class CodeGenerator(MemoryInputArchive.CodeGenerator):
+        def __init__(self, code):
+            super(ChunkedInputArchive.CodeGenerator, self).__init__(code)
+            self.run = None
+
+        def generate_bounds(self):
+            if self.run is None:
+                return
+            position, level = self.run
+            self.run = None
+            indent = ' ' * 4 * level
+            self.code[position:position] = [
+                indent + 'if index + {size} > len(data):'.format(size=self.index),
+                indent + '    data, index = archive.fill(index, {size})'.format(size=self.index),
+            ]
+
+        def generate(self, member_type, variable_name, context=None):
+            if context and hasattr(context, 'container_element_size'):
+                size = 'container_size * {size}'.format(size=context.container_element_size)
+            elif not hasattr(member_type, '__zpp_class__'):
+                size = 'len({variable_name})'.format(variable_name=variable_name)
+            else:
+                if self.run is None:
+                    self.run = (len(self.code), self.code.level)
+                return super(ChunkedInputArchive.CodeGenerator, self).generate(member_type, variable_name, context)
+
+            self.generate_bounds()
+            view = getattr(context, 'container_view', False)
+            self.code.append_with_tag({'index_addition_optimization': ('size', self.index)}, [
+                'size = {size}' '\n'
+                'if index{index} + size > len(data):' '\n'
+                '    data, index = archive.fill(index, {offset}size)' '\n'
+                '{owned}'
+                '{variable_name}{assign} = memoryview(data)[index{index} : index{index} + size]' '\n'
+                '{borrowed}'
+                'index += size{index}'.format(variable_name=variable_name,
+                                              size=size,
+                                              offset='%d + ' % self.index if self.index else '',
+                                              owned='' if view else self._owned_string(variable_name),
+                                              borrowed=self._borrowed_string(variable_name) if view else '',
+                                              assign='' if view else '[:]',
+                                              index=self._index_string())
+            ])
+            self.index = 0
+
+        def generate_end(self):
+            self.generate_bounds()
+            super(ChunkedInputArchive.CodeGenerator, self).generate_end()
+
+        def generate_flush(self):
+            self.generate_bounds()
+            super(ChunkedInputArchive.CodeGenerator, self).generate_flush()
+
+        def generate_reload(self):
+            self.code += [
+                'data = archive.data'
+            ]
+            super(ChunkedInputArchive.CodeGenerator, self).generate_reload()
+
+        def generate_enter_loop(self):
+            self.generate_bounds()
+            super(ChunkedInputArchive.CodeGenerator, self).generate_enter_loop()
+
+        def generate_exit_loop(self):
+            self.generate_bounds()
+            super(ChunkedInputArchive.CodeGenerator, self).generate_exit_loop()
+
+    def __init__(self, segments):
+        self.segments = []
+        self.starts = []
+        length = 0
+        for segment in segments:
+            view = memoryview(segment)
+            if view.format != 'B' or view.ndim != 1:
+                view = view.cast('B')
+            if len(view):
+                self.segments.append(view)
+                self.starts.append(length)
+                length += len(view)
+        self.length = length
+        self.data = self.segments[0] if self.segments else bytearray()
+        self.base = 0
+        self.index = 0
+
+    def __call__(self, *args):
+        return tuple(item.__zpp_class__.chunked_deserialize(item, self) for item in args) if \
+            len(args) > 1 else args[0].__zpp_class__.chunked_deserialize(args[0], self)
+
+    @property
+    def position(self):
+        return self.base + self.index
+
+    def reset(self, index):
+        self.base = 0
+        self.data, self.index = self.fill(index, 0)
+
+    def fill(self, index, size):
+        position = self.base + index
+        if position + size > self.length:
+            raise ValueError("Reading %d bytes at offset %d exceeds the %d bytes of input." % (
+                size, position, self.length))
+        if not self.segments:
+            return self.data, index
+        segment = max(bisect.bisect_right(self.starts, position) - 1, 0)
+        start = self.starts[segment]
+        data = self.segments[segment]
+        if position + size > start + len(data):
+            buffers = [data[position - start:]]
+            remaining = size - len(buffers[0])
+            while remaining > 0:
+                segment += 1
+                buffers.append(self.segments[segment][:remaining])
+                remaining -= len(buffers[-1])
+            data = join_buffers(buffers)
+            start = position
+        self.data = data
+        self.base = start
+        return data, position - start
+
+class InternInputArchive(MemoryInputArchive):
+    name = "intern"
+
+    class CodeGenerator(MemoryInputArchive.CodeGenerator):
+        def __init__(self, code):
+            super(InternInputArchive.CodeGenerator, self).__init__(code)
+
+        def generate_start(self):
+            super(InternInputArchive.CodeGenerator, self).generate_start()
+            self.code += [
+                'strings = archive.strings'
+            ]
+
+        def generate(self, member_type, variable_name, context=None):
+            if not (context and getattr(context, 'container_encoding', None)):
+                return super(InternInputArchive.CodeGenerator, self).generate(
+                    member_type, variable_name, context)
+
+            self.code.append_with_tag({'index_addition_optimization': ('size', self.index)}, [
+                'size = container_size * {size}' '\n'
+                '{variable_name} = strings(data, index{index}, size)' '\n'
+                'index += size{index}'.format(variable_name=variable_name,
+                                              size=context.container_element_size,
+                                              index=self._index_string())
+            ])
+            self.index = 0
+
+    def __init__(self, data, index=0, strings=None):
+        super(InternInputArchive, self).__init__(data, index=index)
+        self.strings = strings if strings is not None else InternTable()
+
+    def __call__(self, *args):
+        return tuple(item.__zpp_class__.intern_deserialize(item, self) for item in args) if \
+            len(args) > 1 else args[0].__zpp_class__.intern_deserialize(args[0], self)
+
+small_varints = tuple(bytes(bytearray((value,))) for value in range(128))
+
+def encode_varint(value):
+    if value < 0 or value >> 64:
+        raise OverflowError("Value %d cannot be encoded as a varint." % (value,))
+    encoded = bytearray()
+    while value >= 128:
+        encoded.append((value & 0x7f) | 0x80)
+        value >>= 7
+    encoded.append(value)
+    return encoded
+
+def decode_varint(data, index):
+    value = 0
+    shift = 0
+    position = index
+    while True:
+        byte = data[position]
+        value |= (byte & 0x7f) << shift
+        position += 1
+        if byte < 128:
+            return value, position - index
+        shift += 7
+        if shift > 63:
+            raise ValueError("Varint at offset %d is too long." % (index,))
+
+def compact_member(member_type, context):
+    if context and getattr(context, 'container_size', False):
+        return True
+    return getattr(getattr(member_type, '__zpp_class__', None), 'compact', False)
+
+class CompactOutputArchive(object):
+    name = "compact"
+
+    class CodeGenerator(MemoryOutputArchive.CodeGenerator):
+        def __init__(self, code):
+            super(CompactOutputArchive.CodeGenerator, self).__init__(code)
+
+        def generate(self, member_type, variable_name, context=None):
+            if not compact_member(member_type, context):
+                return super(CompactOutputArchive.CodeGenerator, self).generate(
+                    member_type, variable_name, context)
+
+            self.code += [
+                'value = {variable_name}'.format(variable_name=variable_name)
+            ]
+            if getattr(member_type.__zpp_class__, 'signed', False):
+                self.code += [
+                    'value = (value << 1) ^ (value >> 63)'
+                ]
+            self.code.append_with_tag({'index_addition_optimization': ('size', self.index)}, [
+                'if 0 <= value < 128:' '\n'
+                '    size = 1' '\n'
+                '    data[index{index} : index{index} + 1] = small_varints[value]' '\n'
+                'else:' '\n'
+                '    encoded = encode_varint(value)' '\n'
+                '    size = len(encoded)' '\n'
+                '    data[index{index} : index{index} + size] = encoded' '\n'
+                'index += size{index}'.format(index=self._index_string())
+            ])
+            self.index = 0
+
+    def __init__(self, data, index=None):
+        self.data = data
+        if index is not None:
+            self.index = index
+        else:
+            self.index = len(data)
+
+    def __call__(self, *args):
+        for item in args:
+            type(item).__zpp_class__.compact_serialize(item, self)
+
+    def reset(self, index):
+        self.index = index
+
+class CompactInputArchive(MemoryInputArchive):
+    name = "compact"
+
+    class CodeGenerator(MemoryInputArchive.CodeGenerator):
+        def __init__(self, code):
+            super(CompactInputArchive.CodeGenerator, self).__init__(code)
+
+        def generate(self, member_type, variable_name, context=None):
+            if not compact_member(member_type, context):
+                return super(CompactInputArchive.CodeGenerator, self).generate(
+                    member_type, variable_name, context)
+
+            if context and getattr(context, 'container_size', False):
+                value = 'value'
+            elif member_type.__zpp_class__.signed:
+                value = '{member_type}((value >> 1) ^ -(value & 1))'.format(
+                    member_type=member_type.__name__)
+            else:
+                value = '{member_type}(value)'.format(member_type=member_type.__name__)
+            self.code.append_with_tag({'index_addition_optimization': ('size', self.index)}, [
+                'value = data[index{index}]' '\n'
+                'if value < 128:' '\n'
+                '    size = 1' '\n'
+                'else:' '\n'
+                '    value, size = decode_varint(data, index{index})' '\n'
+                '{variable_name} = {value}' '\n'
+                'index += size{index}'.format(variable_name=variable_name,
+                                              value=value,
+                                              index=self._index_string())
+            ])
+            self.index = 0
+
+    def __call__(self, *args):
+        return tuple(item.__zpp_class__.compact_deserialize(item, self) for item in args) if \
+            len(args) > 1 else args[0].__zpp_class__.compact_deserialize(args[0], self)
+
+class DictionaryOutputArchive(object):
+    name = "dictionary"
+
+    class CodeGenerator(MemoryOutputArchive.CodeGenerator):
+        def __init__(self, code):
+            super(DictionaryOutputArchive.CodeGenerator, self).__init__(code)
+
+        def generate_string(self, variable_name):
+            self.code.append_with_tag({'index_addition_optimization': ('size', self.index)}, [
+                'size = archive.write_string(data, index{index}, {variable_name}.data)' '\n'
+                'index += size{index}'.format(variable_name=variable_name,
+                                              index=self._index_string())
+            ])
+            self.index = 0
+
+    def __init__(self, data, index=None, capacity=65536):
+        self.data = data
+        if index is not None:
+            self.index = index
+        else:
+            self.index = len(data)
+        self.capacity = capacity
+        self.strings = {}
+
+    def __call__(self, *args):
+        for item in args:
+            type(item).__zpp_class__.dictionary_serialize(item, self)
+
+    def reset(self, index):
+        self.index = index
+        self.strings.clear()
+
+    def write_string(self, data, index, value):
+        payload = memoryview(value).tobytes()
+        reference = self.strings.get(payload)
+        if reference is not None:
+            value = (reference << 1) | 1
+            header = small_varints[value] if value < 128 else encode_varint(value)
+            data[index : index + len(header)] = header
+            return len(header)
+
+        if len(self.strings) < self.capacity:
+            self.strings[payload] = len(self.strings)
+        value = len(payload) << 1
+        header = small_varints[value] if value < 128 else encode_varint(value)
+        size = len(header) + len(payload)
+        data[index : index + size] = header + payload
+        return size
+
+class DictionaryInputArchive(MemoryInputArchive):
+    name = "dictionary"
+
+    class CodeGenerator(MemoryInputArchive.CodeGenerator):
+        def __init__(self, code):
+            super(DictionaryInputArchive.CodeGenerator, self).__init__(code)
+
+        def generate_string(self, variable_name):
+            self.code.append_with_tag({'index_addition_optimization': ('size', self.index)}, [
+                '{variable_name}.data, size = archive.read_string(data, index{index})' '\n'
+                'index += size{index}'.format(variable_name=variable_name,
+                                              index=self._index_string())
+            ])
+            self.index = 0
+
+    def __init__(self, data, index=0, capacity=65536):
+        super(DictionaryInputArchive, self).__init__(data, index=index)
+        self.capacity = capacity
+        self.strings = []
+
+    def __call__(self, *args):
+        return tuple(item.__zpp_class__.dictionary_deserialize(item, self) for item in args) if \
+            len(args) > 1 else args[0].__zpp_class__.dictionary_deserialize(args[0], self)
+
+    def reset(self, index):
+        self.index = index
+        del self.strings[:]
+
+    def read_string(self, data, index):
+        value = data[index]
+        if value < 128:
+            size = 1
+        else:
+            value, size = decode_varint(data, index)
+        if value & 1:
+            if value >> 1 >= len(self.strings):
+                raise ValueError("Unknown string reference %d at offset %d." % (value >> 1, index))
+            return self.strings[value >> 1], size
+
+        length = value >> 1
+        if index + size + length > len(data):
+            raise ValueError("Reading %d bytes at offset %d exceeds the %d bytes of input." % (
+                length, index + size, len(data)))
+        payload = InternedBytes(memoryview(data)[index + size : index + size + length].tobytes())
+        if len(self.strings) < self.capacity:
+            self.strings.append(payload)
+        return payload, size + length
+
+class ReferenceOutputArchive(object):
+    name = "reference"
+
+    class CodeGenerator(MemoryOutputArchive.CodeGenerator):
+        def __init__(self, code):
+            super(ReferenceOutputArchive.CodeGenerator, self).__init__(code)
+
+        def generate_reference(self, variable_name):
+            self.code += [
+                'archive.write_reference({variable_name})'.format(variable_name=variable_name)
+            ]
+
+    def __init__(self, data, index=None):
+        self.data = data
+        if index is not None:
+            self.index = index
+        else:
+            self.index = len(data)
+        self.references = {}
+        self.objects = []
+
+    def __call__(self, *args):
+        for item in args:
+            zpp_class = type(item).__zpp_class__
+            if hasattr(zpp_class, 'serialization_id'):
+                self.write_reference(item)
+            else:
+                zpp_class.reference_serialize(item, self)
+
+    def reset(self, index):
+        self.index = index
+        self.references.clear()
+        del self.objects[:]
+
+    def write_reference(self, item):
+        reference = self.references.get(id(item))
+        if reference is None:
+            self.references[id(item)] = len(self.objects)
+            self.objects.append(item)
+            value = 0
+        else:
+            value = reference + 1
+        header = small_varints[value] if value < 128 else encode_varint(value)
+        self.data[self.index : self.index + len(header)] = header
+        self.index += len(header)
+        if reference is None:
+            type(item).__zpp_class__.reference_serialize(item, self)
+
+class ReferenceInputArchive(MemoryInputArchive):
+    name = "reference"
+
+    class CodeGenerator(MemoryInputArchive.CodeGenerator):
+        def __init__(self, code):
+            super(ReferenceInputArchive.CodeGenerator, self).__init__(code)
+
+        def generate_reference(self, variable_name):
+            if variable_name.endswith(']') or '.' not in variable_name:
+                self.code += [
+                    '{variable_name} = archive.read_reference()'.format(variable_name=variable_name)
+                ]
+            else:
+                owner, name = variable_name.rsplit('.', 1)
+                self.code += [
+                    "object.__setattr__({owner}, '{name}', archive.read_reference())".format(
+                        owner=owner, name=name)
+                ]
+
+    def __init__(self, data, index=0):
+        super(ReferenceInputArchive, self).__init__(data, index=index)
+        self.objects = []
+
+    def __call__(self, *args):
+        return tuple(self.deserialize(item) for item in args) if \
+            len(args) > 1 else self.deserialize(args[0])
+
+    def reset(self, index):
+        self.index = index
+        del self.objects[:]
+
+    def deserialize(self, item):
+        if hasattr(item.__zpp_class__, 'serialization_id'):
+            return self.read_reference()
+        return item.__zpp_class__.reference_deserialize(item, self)
+
+    def read_reference(self):
+        value = self.data[self.index]
+        if value < 128:
+            size = 1
+        else:
+            value, size = decode_varint(self.data, self.index)
+        if value:
+            if value > len(self.objects):
+                raise ValueError("Unknown object reference %d at offset %d." % (value - 1, self.index))
+            self.index += size
+            return self.objects[value - 1]
+
+        self.index += size
+        header_size = Uint64.__zpp_class__.size
+        serialization_id = Uint64.deserialize(
+            memoryview(self.data)[self.index : self.index + header_size])[0]
+        self.index += header_size
+        item = polymorphic.registry[serialization_id]()
+        self.objects.append(item)
+        item.__zpp_class__.non_polymorphic_reference_deserialize(item, self)
+        return item
+
+def delta_layout(cls):
+    zpp_class = cls.__zpp_class__
+    if not hasattr(zpp_class, 'members'):
+        raise TypeError("Delta encoding requires a serializable class, got %s." % (cls.__name__,))
+    layout = []
+    for name in zpp_class.members:
+        member_class = getattr(cls, name).__zpp_class__
+        if member_class.fundamental or member_class.trivially_copyable:
+            layout.append(member_class.size)
+        else:
+            layout.append(None)
+    return layout
+
+def delta_fields(item):
+    cls = type(item)
+    zpp_class = cls.__zpp_class__
+    if zpp_class.trivially_copyable:
+        data = memoryview(item.__zpp_data__)
+        return [data[zpp_class.offsets[name] :
+                     zpp_class.offsets[name] + getattr(cls, name).__zpp_class__.size].tobytes()
+                for name in zpp_class.members]
+    fields = []
+    for name in zpp_class.members:
+        buffer = bytearray()
+        value = getattr(item, name)
+        type(value).__zpp_class__.memory_serialize(value, MemoryOutputArchive(buffer))
+        fields.append(bytes(buffer))
+    return fields
+
+class DeltaOutputArchive(object):
+    def __init__(self, data=None, index=None):
+        self.data = data if data is not None else bytearray()
+        self.index = index if index is not None else len(self.data)
+        self.previous = {}
+        self.layouts = {}
+
+    def __call__(self, *args):
+        for item in args:
+            cls = type(item)
+            layout = self.layouts.get(cls)
+            if layout is None:
+                layout = self.layouts[cls] = delta_layout(cls)
+            fields = delta_fields(item)
+            previous = self.previous.get(cls)
+
+            bitmap = bytearray((len(fields) + 7) // 8)
+            changes = bytearray()
+            for position, field in enumerate(fields):
+                if previous is not None and previous[position] == field:
+                    continue
+                bitmap[position >> 3] |= 1 << (position & 7)
+                if layout[position] is None:
+                    changes += encode_varint(len(field))
+                changes += field
+
+            if hasattr(cls.__zpp_class__, 'serialization_id'):
+                self.write(Uint64.serialize(cls.__zpp_class__.serialization_id))
+            self.write(bitmap)
+            self.write(changes)
+            self.previous[cls] = fields
+
+    def write(self, buffer):
+        self.data[self.index : self.index + len(buffer)] = buffer
+        self.index += len(buffer)
+
+    def reset(self, index):
+        self.index = index
+        self.previous.clear()
+
+class DeltaInputArchive(object):
+    def __init__(self, data, index=0):
+        self.data = data
+        self.index = index
+        self.previous = {}
+        self.layouts = {}
+
+    def __call__(self, *args):
+        return tuple(self.deserialize(item) for item in args) if \
+            len(args) > 1 else self.deserialize(args[0])
+
+    def reset(self, index):
+        self.index = index
+        self.previous.clear()
+
+    def read(self, size):
+        index = self.index
+        if index + size > len(self.data):
+            raise ValueError("Reading %d bytes at offset %d exceeds the %d bytes of input." % (
+                size, index, len(self.data)))
+        self.index = index + size
+        return memoryview(self.data)[index : self.index].tobytes()
+
+    def deserialize(self, item):
+        header = b''
+        if hasattr(item.__zpp_class__, 'serialization_id'):
+            header = self.read(Uint64.__zpp_class__.size)
+            cls = polymorphic.registry[Uint64.deserialize(header)[0]]
+        else:
+            cls = type(item)
+
+        layout = self.layouts.get(cls)
+        if layout is None:
+            layout = self.layouts[cls] = delta_layout(cls)
+        previous = self.previous.get(cls)
+        bitmap = bytearray(self.read((len(layout) + 7) // 8))
+
+        fields = []
+        for position, size in enumerate(layout):
+            if not bitmap[position >> 3] & (1 << (position & 7)):
+                if previous is None:
+                    raise ValueError("Delta of %s at offset %d has no previous instance." % (
+                        cls.__name__, self.index))
+                fields.append(previous[position])
+                continue
+            if size is None:
+                size, length = decode_varint(self.data, self.index)
+                self.index += length
+            fields.append(self.read(size))
+
+        self.previous[cls] = fields
+        return item.__zpp_class__.memory_deserialize(
+            item, MemoryInputArchive(bytearray(header + b''.join(fields))))
+
+# Single producer, single consumer. Slots are written before head and read before tail
+# is published, relying on aligned 8 byte stores being seen in program order (x86-64).
+class ShmRing(object):
+    header_size = 192
+    head, tail, slots_word, slot_size_word = 0, 8, 16, 17
+
+    def __init__(self, name=None, slots=1024, slot_size=4096, create=None, buffer=None):
+        if create is None:
+            create = name is None and buffer is None
+        if create and slot_size % 8:
+            raise ValueError("Slot size must be a multiple of 8.")
+        self.memory = None
+        if buffer is None:
+            try:
+                from multiprocessing import shared_memory
+            except ImportError:
+                raise TypeError("Shared memory is not available, a buffer must be provided.")
+            self.memory = shared_memory.SharedMemory(name=name, create=create,
+                                                     size=self.header_size + slots * slot_size if create else 0)
+            buffer = self.memory.buf
+        view = memoryview(buffer)
+        if view.format != 'B' or view.ndim != 1:
+            view = view.cast('B')
+        self.buffer = view
+        self.words = view.cast('Q')
+        if create:
+            if len(self.buffer) < self.header_size + slots * slot_size:
+                raise ValueError("Buffer is too small for %d slots of %d bytes." % (slots, slot_size))
+            self.words[self.head] = self.words[self.tail] = 0
+            self.words[self.slots_word] = slots
+            self.words[self.slot_size_word] = slot_size
+        self.slots = self.words[self.slots_word]
+        self.slot_size = self.words[self.slot_size_word]
+        self.sizes = SizeArchive()
+        self.output = MemoryOutputArchive(self.buffer, index=0)
+        self.input = MemoryInputArchive(self.buffer)
+        self.view = ViewInputArchive(self.buffer)
+
+    @property
+    def name(self):
+        return self.memory.name if self.memory is not None else None
+
+    def __len__(self):
+        return self.words[self.head] - self.words[self.tail]
+
+    def _offset(self, position):
+        return self.header_size + position % self.slots * self.slot_size
+
+    def push(self, item):
+        words = self.words
+        head = words[self.head]
+        if head - words[self.tail] >= self.slots:
+            return False
+        zpp_class = type(item).__zpp_class__
+        sizes = self.sizes
+        sizes.index = 0
+        zpp_class.size_serialize(item, sizes)
+        if sizes.index > self.slot_size - 8:
+            raise OverflowError("Serialized size %d exceeds the slot size of %d bytes." % (
+                sizes.index, self.slot_size - 8))
+        offset = self._offset(head)
+        words[offset // 8] = sizes.index
+        self.output.index = offset + 8
+        zpp_class.memory_serialize(item, self.output)
+        words[self.head] = head + 1
+        return True
+
+    def pop(self, item):
+        words = self.words
+        tail = words[self.tail]
+        if tail == words[self.head]:
+            return None
+        self.input.index = self._offset(tail) + 8
+        result = self.input(item)
+        words[self.tail] = tail + 1
+        return item if result is None else result
+
+    def peek(self, item):
+        tail = self.words[self.tail]
+        if tail == self.words[self.head]:
+            return None
+        self.view.index = self._offset(tail) + 8
+        result = self.view(item)
+        return item if result is None else result
+
+    def release(self):
+        self.words[self.tail] += 1
+
+    def close(self):
+        self.words = self.buffer = self.output = self.input = self.view = None
+        if self.memory is not None:
+            try:
+                self.memory.close()
+            except BufferError:
+                pass
+
+    def unlink(self):
+        if self.memory is not None:
+            self.memory.unlink()
+
+def frame_offsets(data, index=0):
+    unpack_from = struct.Struct(SizeType.tag).unpack_from
+    header_size = SizeType.__zpp_class__.size
+    offsets = []
+    length = len(data)
+    while index < length:
+        offsets.append(index)
+        index += header_size + unpack_from(data, index)[0]
+    if index != length:
+        raise ValueError("Truncated frame at offset %d." % (offsets[-1],))
+    return offsets
+
+def decode_frames(arguments):
+    import mmap
+    path, cls, function, begin, end = arguments
+    with open(path, 'rb') as capture:
+        data = mmap.mmap(capture.fileno(), 0, access=mmap.ACCESS_READ)
+    archive = MemoryInputArchive(data)
+    polymorphic = hasattr(cls.__zpp_class__, 'serialization_id')
+    header_size = SizeType.__zpp_class__.size
+    unpack_from = struct.Struct(SizeType.tag).unpack_from
+    results = []
+    index = begin
+    while index < end:
+        archive.index = index + header_size
+        item = cls if polymorphic else cls()
+        result = archive(item)
+        if result is None:
+            result = item
+        results.append(function(result) if function else result)
+        index += header_size + unpack_from(data, index)[0]
+    return results
+
+def parallel_decode(path, cls, workers=None, function=None, chunks=None):
+    import mmap
+    import multiprocessing
+    with open(path, 'rb') as capture:
+        if not os.fstat(capture.fileno()).st_size:
+            return []
+        data = mmap.mmap(capture.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        offsets = frame_offsets(data)
+        end = len(data)
+    finally:
+        data.close()
+
+    pool = multiprocessing.Pool(workers)
+    try:
+        if chunks is None:
+            chunks = 4 * (workers or multiprocessing.cpu_count())
+        step = max(1, -(-len(offsets) // chunks))
+        bounds = offsets[::step] + [end]
+        results = []
+        for chunk in pool.imap(decode_frames, [(path, cls, function, begin, stop)
+                                               for begin, stop in zip(bounds, bounds[1:])]):
+            results += chunk
+        return results
+    finally:
+        pool.close()
+        pool.join()
+
+class RecordIndex(object):
+    footer = struct.Struct('<QQ8s')
+    entry = struct.Struct('<Q')
+    magic = b'ZPPRIDX1'
+    ids = 1
+    checksums = 2
+
+    @classmethod
+    def read(cls, data):
+        if len(data) < cls.footer.size:
+            raise ValueError("Not a record file.")
+        count, flags, magic = cls.footer.unpack_from(data, len(data) - cls.footer.size)
+        index = len(data) - cls.footer.size - count * cls.stride(flags)
+        if magic != cls.magic or index < 0:
+            raise ValueError("Not a record file.")
+        return count, flags, index
+
+    @classmethod
+    def stride(cls, flags):
+        return cls.entry.size * (1 + bool(flags & cls.ids) + bool(flags & cls.checksums))
+
+    @classmethod
+    def recover(cls, data, flags):
+        import zlib
+        unpack_from = struct.Struct(SizeType.tag).unpack_from
+        header_size = SizeType.__zpp_class__.size
+        entries = []
+        index = 0
+        while index + header_size <= len(data):
+            start = index + header_size
+            end = start + unpack_from(data, index)[0]
+            if end > len(data):
+                break
+            entries.append(index)
+            if flags & cls.ids:
+                serialization_id = Uint64.unpack_from(data, start)[0] if end - start >= 8 else 0
+                entries.append(serialization_id if serialization_id in polymorphic.registry else 0)
+            if flags & cls.checksums:
+                entries.append(zlib.crc32(memoryview(data)[start:end]) & 0xffffffff)
+            index = end
+        return entries, index
+
+class RecordWriter(object):
+    def __init__(self, path, ids=False, checksums=False, recover=False):
+        flags = (RecordIndex.ids if ids else 0) | (RecordIndex.checksums if checksums else 0)
+        self.entries = []
+        if os.path.exists(path) and os.path.getsize(path):
+            import mmap
+            with open(path, 'rb') as records:
+                data = mmap.mmap(records.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                try:
+                    count, existing_flags, index = RecordIndex.read(data)
+                except ValueError:
+                    if not recover:
+                        raise
+                    self.entries, index = RecordIndex.recover(data, flags)
+                else:
+                    if flags & ~existing_flags:
+                        raise ValueError("Existing records were written without %s." % (
+                            'serialization ids' if flags & ~existing_flags & RecordIndex.ids else 'checksums',))
+                    flags = existing_flags
+                    fields = RecordIndex.stride(flags) // RecordIndex.entry.size
+                    self.entries = list(struct.unpack_from('<%dQ' % (count * fields), data, index))
+            finally:
+                data.close()
+            self.file = open(path, 'r+b')
+            self.file.seek(index)
+            self.file.truncate()
+        else:
+            self.file = open(path, 'w+b')
+        self.flags = flags
+        self.fields = RecordIndex.stride(flags) // RecordIndex.entry.size
+        self.position = self.file.tell()
+        self.buffer = OutputBuffer()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        return len(self.entries) // self.fields
+
+    def write(self, *args):
+        import zlib
+        buffer = self.buffer
+        header_size = SizeType.__zpp_class__.size
+        entries = self.entries
+        for item in args:
+            zpp_class = type(item).__zpp_class__
+            buffer.clear()
+            buffer.reserve(header_size)
+            buffer.index = header_size
+            buffer(item)
+            struct.pack_into(SizeType.tag, buffer.data, 0, buffer.index - header_size)
+            self.file.write(buffer.getbuffer())
+            entries.append(self.position)
+            if self.flags & RecordIndex.ids:
+                entries.append(getattr(zpp_class, 'serialization_id', 0))
+            if self.flags & RecordIndex.checksums:
+                entries.append(zlib.crc32(buffer.getbuffer()[header_size:]) & 0xffffffff)
+            self.position += buffer.index
+
+    def close(self):
+        if self.file is None:
+            return
+        self.file.write(struct.pack('<%dQ' % len(self.entries), *self.entries))
+        self.file.write(RecordIndex.footer.pack(len(self), self.flags, RecordIndex.magic))
+        self.file.close()
+        self.file = None
+
+class RecordReader(object):
+    def __init__(self, path, cls, verify=True, recover=False):
+        import mmap
+        with open(path, 'rb') as records:
+            self.data = mmap.mmap(records.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self.count, flags, self.index = RecordIndex.read(self.data)
+            self.table = self.data
+        except ValueError:
+            if not recover:
+                raise
+            flags = RecordIndex.ids
+            entries = RecordIndex.recover(self.data, flags)[0]
+            self.table = struct.pack('<%dQ' % len(entries), *entries)
+            self.count = len(entries) // 2
+            self.index = 0
+        self.has_ids = bool(flags & RecordIndex.ids)
+        self.has_checksums = bool(flags & RecordIndex.checksums)
+        self.stride = RecordIndex.stride(flags)
+        self.verify = verify
+        self.cls = cls
+        self.polymorphic = hasattr(cls.__zpp_class__, 'serialization_id')
+        self.archive = MemoryInputArchive(self.data)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if type(index) is slice:
+            return [self[i] for i in range(*index.indices(self.count))]
+        offset = self.offset(index)
+        if self.verify and self.has_checksums:
+            self.check(index, offset)
+        return self.read(offset)
+
+    def __iter__(self):
+        for index in range(self.count):
+            yield self[index]
+
+    def entry(self, index, field):
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("Record index out of range.")
+        return RecordIndex.entry.unpack_from(self.table,
+                                             self.index + index * self.stride + field * RecordIndex.entry.size)[0]
+
+    def offset(self, index):
+        return self.entry(index, 0)
+
+    def serialization_id(self, index):
+        if not self.has_ids:
+            raise ValueError("Records were written without serialization ids.")
+        return self.entry(index, 1)
+
+    def checksum(self, index):
+        if not self.has_checksums:
+            raise ValueError("Records were written without checksums.")
+        return self.entry(index, 1 + self.has_ids)
+
+    def check(self, index, offset=None):
+        if offset is None:
+            offset = self.offset(index)
+        header_size = SizeType.__zpp_class__.size
+        size = struct.unpack_from(SizeType.tag, self.data, offset)[0]
+        offset += header_size
+        import zlib
+        if zlib.crc32(memoryview(self.data)[offset : offset + size]) & 0xffffffff != self.checksum(index):
+            raise ValueError("Checksum mismatch in record %d." % (index,))
+
+    def read(self, offset):
+        archive = self.archive
+        archive.index = offset + SizeType.__zpp_class__.size
+        item = self.cls if self.polymorphic else self.cls()
+        result = archive(item)
+        return item if result is None else result
+
+    def indices(self, cls):
+        serialization_id = cls.__zpp_class__.serialization_id
+        if not self.has_ids:
+            raise ValueError("Records were written without serialization ids.")
+        unpack_from = RecordIndex.entry.unpack_from
+        start = self.index + RecordIndex.entry.size
+        return [index for index in range(self.count)
+                if unpack_from(self.table, start + index * self.stride)[0] == serialization_id]
+
+    def scan(self, cls):
+        for index in self.indices(cls):
+            yield self[index]
+
+    def close(self):
+        self.archive = None
+        self.table = None
+        try:
+            self.data.close()
+        except BufferError:
+            pass
+        self.data = None
+
+class CompressedIndex(object):
+    header = struct.Struct('<II')
+    entry = struct.Struct('<QQ')
+    footer = struct.Struct('<QQQ8s')
+    magic = b'ZPPZIDX1'
+    codecs = ('zlib', 'lzma')
+
+    @staticmethod
+    def codec(name):
+        if name in CompressedIndex.codecs:
+            try:
+                return __import__(name)
+            except ImportError:
+                pass
+        raise ValueError("Unsupported codec '%s'." % (name,))
+
+class CompressedOutputArchive(object):
+    def __init__(self, path, codec='zlib', block_size=1 << 20):
+        self.compress = CompressedIndex.codec(codec).compress
+        self.codec = codec
+        self.block_size = block_size
+        self.file = open(path, 'wb')
+        self.buffer = OutputBuffer(block_size)
+        self.blocks = []
+        self.count = 0
+        self.block_count = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        return self.count
+
+    def __call__(self, *args):
+        buffer = self.buffer
+        header_size = SizeType.__zpp_class__.size
+        for item in args:
+            begin = buffer.index
+            buffer.reserve(begin + header_size)
+            buffer.index = begin + header_size
+            buffer(item)
+            struct.pack_into(SizeType.tag, buffer.data, begin, buffer.index - begin - header_size)
+            self.count += 1
+            if buffer.index >= self.block_size:
+                self.flush()
+
+    def flush(self):
+        buffer = self.buffer
+        if not buffer.index:
+            return
+        block = self.compress(buffer.getbuffer())
+        self.blocks.append((self.file.tell(), self.block_count))
+        self.file.write(CompressedIndex.header.pack(len(block), buffer.index))
+        self.file.write(block)
+        self.block_count = self.count
+        buffer.clear()
+
+    def close(self):
+        if self.file is None:
+            return
+        self.flush()
+        for entry in self.blocks:
+            self.file.write(CompressedIndex.entry.pack(*entry))
+        self.file.write(CompressedIndex.footer.pack(len(self.blocks), self.count,
+                                                    CompressedIndex.codecs.index(self.codec),
+                                                    CompressedIndex.magic))
+        self.file.close()
+        self.file = None
+
+class CompressedInputArchive(object):
+    def __init__(self, path):
+        self.file = open(path, 'rb')
+        self.file.seek(0, os.SEEK_END)
+        size = self.file.tell()
+        footer = CompressedIndex.footer
+        if size < footer.size:
+            self.close()
+            raise ValueError("Not a compressed archive.")
+        self.file.seek(size - footer.size)
+        blocks, self.count, codec, magic = footer.unpack(self.file.read(footer.size))
+        entry = CompressedIndex.entry
+        index = size - footer.size - blocks * entry.size
+        if magic != CompressedIndex.magic or index < 0 or codec >= len(CompressedIndex.codecs):
+            self.close()
+            raise ValueError("Not a compressed archive.")
+        self.decompress = CompressedIndex.codec(CompressedIndex.codecs[codec]).decompress
+        self.file.seek(index)
+        data = self.file.read(blocks * entry.size)
+        self.offsets = []
+        self.firsts = []
+        for position in range(blocks):
+            offset, first = entry.unpack_from(data, position * entry.size)
+            self.offsets.append(offset)
+            self.firsts.append(first)
+        self.block = -1
+        self.archive = MemoryInputArchive(bytearray())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        return self.count
+
+    def load(self, block):
+        header = CompressedIndex.header
+        self.file.seek(self.offsets[block])
+        compressed_size, size = header.unpack(self.file.read(header.size))
+        data = self.decompress(self.file.read(compressed_size))
+        if len(data) != size:
+            raise ValueError("Corrupted block %d." % (block,))
+        self.block = block
+        self.archive.data = data
+        self.archive.index = 0
+
+    def __call__(self, *args):
+        archive = self.archive
+        header_size = SizeType.__zpp_class__.size
+        results = []
+        for item in args:
+            if archive.index >= len(archive.data):
+                if self.block + 1 >= len(self.offsets):
+                    raise EOFError("No more messages in the archive.")
+                self.load(self.block + 1)
+            archive.index += header_size
+            results.append(archive(item))
+        return tuple(results) if len(args) > 1 else results[0]
+
+    def seek(self, index):
+        if not 0 <= index <= self.count:
+            raise IndexError("Message index out of range.")
+        if index == self.count:
+            self.block = len(self.offsets) - 1
+            self.archive.data = bytearray()
+            self.archive.index = 0
+            return
+        block = bisect.bisect_right(self.firsts, index) - 1
+        if block != self.block:
+            self.load(block)
+        data = self.archive.data
+        unpack_from = struct.Struct(SizeType.tag).unpack_from
+        header_size = SizeType.__zpp_class__.size
+        position = 0
+        for skipped in range(index - self.firsts[block]):
+            position += header_size + unpack_from(data, position)[0]
+        self.archive.index = position
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+class FixedRecordTable(object):
+    def __init__(self, cls, path, key='timestamp', chunk_size=1 << 20):
+        zpp_class = cls.__zpp_class__
+        if not zpp_class.trivially_copyable or zpp_class.fundamental or zpp_class.container:
+            raise TypeError("Fixed record tables require a trivially copyable class.")
+        if key not in zpp_class.offsets:
+            raise ValueError("Class '%s' has no member '%s'." % (cls.__name__, key))
+        key_type = getattr(cls, key)
+        if not key_type.__zpp_class__.fundamental:
+            raise TypeError("Key member '%s' must be of a fundamental type." % (key,))
+        self.cls = cls
+        self.key_name = key
+        self.size = zpp_class.size
+        self.key_offset = zpp_class.offsets[key]
+        self.key_struct = struct.Struct(key_type.tag)
+        self.chunk_size = chunk_size
+        self.file = open(path, 'ab')
+        self.path = path
+        self.data = None
+        self.count = 0
+        self.remap()
+        if os.path.getsize(path) != self.count * self.size:
+            self.close()
+            raise ValueError("File size is not a multiple of the record size %d." % (self.size,))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def remap(self):
+        self.file.flush()
+        self.data = None
+        self.tail = bytearray()
+        self.count = self.mapped = os.path.getsize(self.path) // self.size
+        if self.count:
+            import mmap
+            with open(self.path, 'rb') as records:
+                self.data = mmap.mmap(records.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if type(index) is slice:
+            return [self[i] for i in range(*index.indices(self.count))]
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("Record index out of range.")
+        data, offset = self.locate(index)
+        if data is self.tail:
+            return self.cls(__zpp_data__=data[offset : offset + self.size])
+        record = self.cls(__zpp_data__=memoryview(data)[offset : offset + self.size])
+        record.__zpp_borrowed__ = True
+        return record
+
+    def __iter__(self):
+        for index in range(self.count):
+            yield self[index]
+
+    def locate(self, index):
+        if index < self.mapped:
+            return self.data, index * self.size
+        return self.tail, (index - self.mapped) * self.size
+
+    def key(self, index):
+        data, offset = self.locate(index)
+        return self.key_struct.unpack_from(data, offset + self.key_offset)[0]
+
+    def bisect_left(self, value, low=0, high=None):
+        high = self.count if high is None else high
+        while low < high:
+            middle = (low + high) // 2
+            if self.key(middle) < value:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def bisect_right(self, value, low=0, high=None):
+        high = self.count if high is None else high
+        while low < high:
+            middle = (low + high) // 2
+            if value < self.key(middle):
+                high = middle
+            else:
+                low = middle + 1
+        return low
+
+    def query(self, low=None, high=None):
+        begin = 0 if low is None else self.bisect_left(low)
+        end = self.count if high is None else self.bisect_left(high, begin)
+        return self[begin:end]
+
+    def append(self, record):
+        self.extend((record,))
+
+    def extend(self, records):
+        last = self.key(self.count - 1) if self.count else None
+        make_view = self.cls.__zpp_class__.make_view
+        try:
+            for record in records:
+                record = make_view(record)
+                value = getattr(record, self.key_name)
+                if last is not None and value < last:
+                    raise ValueError("Record key %r is smaller than the last key %r." % (value, last))
+                self.file.write(record.__zpp_data__)
+                self.tail += record.__zpp_data__
+                self.count += 1
+                last = value
+        finally:
+            if len(self.tail) >= max(self.chunk_size, self.mapped * self.size):
+                self.remap()
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = self.data = self.tail = None
+
 class Uint64(int):
     tag = '<Q'
 
@@ -1257,6 +3628,8 @@ serialization_exports = {}
 for kind in (Uint64, Uint32, Uint16, Uint8, Int64, Int32, Int16, Int8, Float, Double, Bool):
     kind.serialize = struct.Struct(kind.tag).pack
     kind.deserialize = struct.Struct(kind.tag).unpack
+    kind.unpack_from = struct.Struct(kind.tag).unpack_from
+    kind.iter_deserialize = struct.Struct(kind.tag).iter_unpack
 
     def make(value, kind=kind):
         return kind(value)
@@ -1270,6 +3643,32 @@ for kind in (Uint64, Uint32, Uint16, Uint8, Int64, Int32, Int16, Int8, Float, Do
         'make_view': staticmethod(make),
     })
 
+compact_types = {}
+
+def Compact(kind):
+    if kind not in compact_types:
+        raise TypeError("Only integer types can be compact, got %s." % (kind.__name__,))
+    return compact_types[kind]
+
+for kind in (Uint64, Uint32, Uint16, Uint8, Int64, Int32, Int16, Int8):
+    compact = type(''.join(('Compact', kind.__name__)), (kind,), {'__reduce_ex__': zpp_reduce})
+
+    def make(value, kind=compact):
+        return kind(value)
+
+    compact.__zpp_class__ = type('zpp_class', (object,), {
+        'fundamental': True,
+        'container': False,
+        'trivially_copyable': False,
+        'compact': True,
+        'signed': kind.tag[-1] in 'bhiq',
+        'size': kind.__zpp_class__.size,
+        'make': staticmethod(make),
+        'make_view': staticmethod(make),
+        'factory': (Compact, (kind,)),
+    })
+    compact_types[kind] = compact
+
 SizeType = Uint32
 
 serialization_exports = {
@@ -1285,18 +3684,25 @@ serialization_exports = {
     'Double': Double,
     'Bool': Bool,
     'SizeType': SizeType,
-    'registry': polymorphic.registry
+    'registry': polymorphic.registry,
+    'small_varints': small_varints,
+    'encode_varint': encode_varint,
+    'decode_varint': decode_varint,
+    'writable_data': writable_data,
 }
+serialization_exports.update((compact.__name__, compact) for compact in compact_types.values())
 
-input_archives = (MemoryInputArchive,)
-output_archives = (MemoryOutputArchive,)
+input_archives = (MemoryInputArchive, ViewInputArchive, ChunkedInputArchive, CompactInputArchive,
+                  InternInputArchive, DictionaryInputArchive, ReferenceInputArchive)
+output_archives = (MemoryOutputArchive, GatherOutputArchive, SizeArchive, CompactOutputArchive,
+                   DictionaryOutputArchive, ReferenceOutputArchive)
 archives = output_archives + input_archives
 
 String = BasicString(Uint8)
 WString = BasicString(Uint16)
+Bytes = BasicBytes()
 
-for kind in (Uint64, Uint32, Uint16, Uint8, Int64, Int32, Int16, Int8, Float, Double, Bool):
-    for archive in archives:
-        function_name, function = SerializationGenerator(kind, archive).generate_code()
-        setattr(kind.__zpp_class__, function_name, staticmethod(function))
+for kind in (Uint64, Uint32, Uint16, Uint8, Int64, Int32, Int16, Int8, Float, Double, Bool) + \
+        tuple(compact_types.values()):
+    generate_lazily(kind, archives)
 